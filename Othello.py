@@ -5,27 +5,70 @@
 # In this game, two players take turns placing their colored pieces on 8x8 board. The objective is to capture
 # the opponent's pieces and have the majority of your own pieces on the board at the end of the game
 
+from collections import namedtuple
+
+import bitboard
+
+TOKENS = {"black": "X", "white": "O"}  # token used on the board for each piece color
+BACKENDS = ("list", "bitboard")
+OPPONENT_TOKENS = {"X": "O", "O": "X"}
+# (row step, column step) for the 8 directions a line of captured pieces can run in
+DIRECTIONS = ((0, 1), (0, -1), (1, 0), (-1, 0), (-1, 1), (1, 1), (-1, -1), (1, -1))
+
+# what a move changed: the color that moved, the (row, column) it placed on and a tuple of the positions it flipped
+MoveRecord = namedtuple("MoveRecord", ["color", "position", "flipped"])
+# immutable copy of a position that can be used as a dictionary key: the size of the playing area and the masks
+Snapshot = namedtuple("Snapshot", ["width", "height", "black", "white"])
+
 
 class Board:
     """
-    A game board is represented by a 10x10 grid.
+    A game board is represented by a 10x10 grid (an 8x8 playing area with an edge around it) by default. Other sizes
+    are made by passing the number of rows and columns including the edge, for example 18x18 for a 16x16 game.
     Edge: * (star)
     Black piece: X
     White piece: O
     Empty space: .  (dot)
     Each position on the board is represented by a (row, column) pair.
+    The position itself is kept as a pair of bitboard masks, one for black and one for white. The 10x10 grid of
+    one-character strings is only built the first time it is asked for (get_game_board, board[row] or the list
+    backend's move generation) and is then kept in sync, so a board that is only used through the bitboard backend
+    stays a few hundred bytes. The backend can be "list" (legal moves found by walking the grid) or "bitboard" (legal
+    moves and flips from the masks).
+    The board keeps a cache of the legal moves for each token that is kept up to date by add_change_tokens, so the
+    board should only be changed through that method (or refresh should be called after changing the grid by hand).
     """
-    def __init__(self, number_rows=10, number_columns=10):
+    __slots__ = ("_number_rows", "_number_columns", "_backend", "_geometry", "_black_bits", "_white_bits",
+                 "_legal_moves", "_changed_squares", "_change_log", "_game_board")
+
+    def __init__(self, number_rows=10, number_columns=10, backend="list"):
         """
         Initializes board class. Can take no parameters and assigns default value of 10 for row and column. For
         othello game, this is the correct number of rows and columns. However, if someone wants to change the grid,
         they can by passing different values as parameters. All data members are private.
         """
+        if backend not in BACKENDS:
+            raise ValueError("backend must be one of " + ", ".join(BACKENDS))
+        if number_rows < 4 or number_columns < 4:
+            raise ValueError("the board needs at least 4 rows and 4 columns, including the edge")
         self._number_rows = number_rows
         self._number_columns = number_columns
+        self._backend = backend
+        self._geometry = bitboard.get_geometry(number_columns - 2, number_rows - 2)
+        self._black_bits = 0  # bitboard masks of the playing area, the counts come from these too
+        self._white_bits = 0
+        # cached legal moves for each token, None until first asked for. A set of positions for the list backend and a
+        # mask for the bitboard backend
+        self._legal_moves = {"X": None, "O": None}
+        self._changed_squares = []  # squares changed since the legal move caches were last brought up to date
+        self._change_log = None  # list of changed positions while a change log is being kept
         # if I wanted to make it so user cannot change the size of the game board, I would have the init method take no
         # parameters and then assign data members self._row = 10 and self_column = 10
-        self._game_board = []  # initializes game_board as an empty list
+        self._game_board = None  # the grid, built from the masks by get_game_board when it is first needed
+
+    def _build_grid(self):
+        """internal function that builds the 2d grid of tokens, with the edge, from the masks"""
+        game_board = []  # initializes game_board as an empty list
         for _ in range(self._number_rows - 2):
             # start filling in the game play part of the board, add top and bottom edges at end
             row = ["*"]
@@ -35,72 +78,272 @@ class Board:
                 # fills in rest of row with . (dot) until second to last symbol
             row.append("*")
             # adds edge symbol (*) to end of the list
-            self._game_board.append(row)
+            game_board.append(row)
             # adds the row to the body, loop continues until you have 8 body rows
-        self._game_board.insert(0, ["*" for _ in range(self._number_columns)])
+        game_board.insert(0, ["*" for _ in range(self._number_columns)])
         # adds the top boarder row
-        self._game_board.append(["*" for _ in range(self._number_columns)])
+        game_board.append(["*" for _ in range(self._number_columns)])
         # adds the bottom border row
+        for index in bitboard.iterate_bits(self._black_bits):
+            row, column = self._geometry.bit_to_square(index)
+            game_board[row][column] = "X"
+        for index in bitboard.iterate_bits(self._white_bits):
+            row, column = self._geometry.bit_to_square(index)
+            game_board[row][column] = "O"
+        return game_board
+
+    def __getitem__(self, row):
+        """allows the board to be read as board[row][column]"""
+        return self.get_game_board()[row]
 
     def get_game_board(self):
-        """returns game board"""
+        """returns game board, building the grid the first time"""
+        if self._game_board is None:
+            self._game_board = self._build_grid()
         return self._game_board
 
+    def get_backend(self):
+        """returns the name of the backend, either list or bitboard"""
+        return self._backend
+
+    def get_number_rows(self):
+        """returns the number of rows, including the edge"""
+        return self._number_rows
+
+    def get_number_columns(self):
+        """returns the number of columns, including the edge"""
+        return self._number_columns
+
+    def get_geometry(self):
+        """returns the BitboardGeometry for the size of the playing area"""
+        return self._geometry
+
+    def get_bitboards(self):
+        """returns the (black, white) masks of the playing area"""
+        return self._black_bits, self._white_bits
+
+    def _bits_from_grid(self):
+        """internal function that builds the (black, white) masks by reading the playing area of the grid"""
+        black_bits = 0
+        white_bits = 0
+        for row in range(1, self._number_rows - 1):
+            for column in range(1, self._number_columns - 1):
+                value = self.get_game_board()[row][column]
+                if value == "X":
+                    black_bits |= 1 << self._geometry.square_to_bit(row, column)
+                elif value == "O":
+                    white_bits |= 1 << self._geometry.square_to_bit(row, column)
+        return black_bits, white_bits
+
     def display_board(self):
         """returns the board as a 2d representation"""
         board_string = ""
-        for row in self._game_board:
+        for row in self.get_game_board():
             board_string += " ".join(row) + "\n"
         return board_string
 
     def add_tokens_to_start_game(self):
-        """adds initial tokens to board for start of game"""
-        self._game_board[4][4] = "O"
-        # if you wanted to make this generalizable to larger boards, it would be
-        # self._body[int(number_rows/2 - 1)][int(number_columns/2-1)]
-        self._game_board[5][5] = "O"
-        # if you wanted to make this generalizable to larger boards, it would be
-        # self._body[int(number_rows/ 2)][int(number_columns/ 2)]
-        self._game_board[4][5] = "X"
-        # if you wanted to make this generalizable to larger boards, it would be
-        # self._body[int(number_rows/2-1)][int(number_columns/ 2)]
-        self._game_board[5][4] = "X"
-        # if you wanted to make this generalizable to larger boards, it would be
-        # self._body[int(number_rows/2)][int(number_columns/ 2 - 1)]
+        """adds initial tokens to board for start of game, the four squares in the middle of the playing area"""
+        top_row = (self._number_rows - 2 + 1) // 2  # (4, 4) to (5, 5) on the standard board
+        left_column = (self._number_columns - 2 + 1) // 2
+        self.add_change_tokens((top_row, left_column), "O")
+        self.add_change_tokens((top_row + 1, left_column + 1), "O")
+        self.add_change_tokens((top_row, left_column + 1), "X")
+        self.add_change_tokens((top_row + 1, left_column), "X")
 
     def add_change_tokens(self, position, token):
         """function to be used by othello class to add or change tokens on the board.
         parameters: position is a list [row, column]
         token = "X" or "O"
         """
-        self._game_board[position[0]][position[1]] = token
+        bit = 1 << self._geometry.square_to_bit(position[0], position[1])
+        if self._black_bits & bit:
+            old_token = "X"
+        elif self._white_bits & bit:
+            old_token = "O"
+        else:
+            old_token = "."
+        if old_token == token:  # flipping a piece that is already the right color changes nothing
+            return
+        self._black_bits &= ~bit
+        self._white_bits &= ~bit
+        if token == "X":
+            self._black_bits |= bit
+        elif token == "O":
+            self._white_bits |= bit
+        if self._game_board is not None:
+            self._game_board[position[0]][position[1]] = token
+        position = self._geometry.get_square(position[0], position[1])  # shared tuple, records don't copy it
+        if self._change_log is not None:
+            self._change_log.append(position)
+        if self._backend == "bitboard":
+            self._legal_moves["X"] = None  # recomputing from the masks is cheaper than updating them
+            self._legal_moves["O"] = None
+        elif self._legal_moves["X"] is not None or self._legal_moves["O"] is not None:
+            self._changed_squares.append(position)
+
+    def start_change_log(self):
+        """starts recording every position changed by add_change_tokens"""
+        self._change_log = []
+
+    def stop_change_log(self):
+        """stops recording changes and returns the list of changed positions, in the order they were changed"""
+        change_log = self._change_log
+        self._change_log = None
+        return change_log
+
+    def refresh(self):
+        """rebuilds the masks from the grid and clears the legal move caches. Only needed if the grid was changed
+        directly"""
+        if self._game_board is not None:
+            self._black_bits, self._white_bits = self._bits_from_grid()
+        self._legal_moves = {"X": None, "O": None}
+        self._changed_squares = []
+
+    def clone(self):
+        """
+        returns an independent copy of the board. The masks are immutable ints and are shared, the grid isn't copied
+        (the copy builds its own when it needs one), so this costs about the same at any board size
+        """
+        board = Board.__new__(Board)
+        board._number_rows = self._number_rows
+        board._number_columns = self._number_columns
+        board._backend = self._backend
+        board._geometry = self._geometry
+        board._black_bits = self._black_bits
+        board._white_bits = self._white_bits
+        if self._backend == "bitboard":
+            board._legal_moves = dict(self._legal_moves)  # masks, shared like the board masks
+        else:  # the list backend updates its sets in place, so they are copied
+            board._legal_moves = {token: None if moves is None else set(moves)
+                                  for token, moves in self._legal_moves.items()}
+        board._changed_squares = list(self._changed_squares)
+        board._change_log = None
+        board._game_board = None
+        return board
+
+    def snapshot(self):
+        """returns the position as an immutable, hashable Snapshot"""
+        return Snapshot(self._geometry.get_width(), self._geometry.get_height(), self._black_bits, self._white_bits)
+
+    @classmethod
+    def from_snapshot(cls, snapshot, backend="list"):
+        """returns a new Board holding the position in a Snapshot"""
+        if snapshot.black & snapshot.white:
+            raise ValueError("invalid position, a square is both black and white")
+        board = cls(snapshot.height + 2, snapshot.width + 2, backend)
+        board._black_bits = snapshot.black
+        board._white_bits = snapshot.white
+        return board
 
     def count_black_tokens(self):
         """returns the number of black tokens (X's) on the board. To be called on by the Othello class"""
-        count = 0
-        for row, row_list in enumerate(self.get_game_board()):  # iterates through every row looking for X
-            for column, value in enumerate(row_list):
-                if value == "X":
-                    count += 1
-        return count
+        return self._black_bits.bit_count()
 
     def count_white_tokens(self):
         """returns the number of white tokens (O's) on the board. To be called on by the Othello class"""
-        count = 0
-        for row, row_list in enumerate(self.get_game_board()):  # iterates through every row looking for O
-            for column, value in enumerate(row_list):
-                if value == "O":
-                    count += 1
-        return count
+        return self._white_bits.bit_count()
+
+    def count_empty_squares(self):
+        """returns the number of empty squares left on the board"""
+        return (self._number_rows - 2) * (self._number_columns - 2) - (self._black_bits | self._white_bits).bit_count()
+
+    def is_legal_move(self, position, token):
+        """returns True if placing token on the empty square at position would capture at least one piece"""
+        board = self.get_game_board()
+        row = position[0]
+        column = position[1]
+        if board[row][column] != ".":
+            return False
+        opponent = OPPONENT_TOKENS[token]
+        for row_step, column_step in DIRECTIONS:
+            compare_row = row + row_step
+            compare_column = column + column_step
+            if board[compare_row][compare_column] != opponent:
+                continue
+            while board[compare_row][compare_column] == opponent:  # follows the line of opponent pieces
+                compare_row += row_step
+                compare_column += column_step
+            if board[compare_row][compare_column] == token:
+                return True
+        return False
+
+    def get_legal_moves(self, token):
+        """
+        returns the set of (row, column) positions where token can move. The set is cached and should not be changed
+        by the caller. With the list backend only the squares that can be affected by a change are checked again:
+        for every changed square, the first empty square in each of the 8 directions and the square itself.
+        """
+        if self._backend == "bitboard":
+            return set(self._geometry.mask_to_squares(self.get_legal_mask(token)))
+        if self._changed_squares:
+            self._update_legal_moves()
+        if self._legal_moves[token] is None:
+            legal_moves = set()
+            for row in range(1, self._number_rows - 1):
+                for column in range(1, self._number_columns - 1):
+                    if self.is_legal_move((row, column), token):
+                        legal_moves.add((row, column))
+            self._legal_moves[token] = legal_moves
+        return self._legal_moves[token]
+
+    def get_legal_mask(self, token):
+        """returns the legal moves for token as a bitboard mask, cached until the board changes"""
+        if self._backend != "bitboard":
+            mask = 0
+            for row, column in self.get_legal_moves(token):
+                mask |= 1 << self._geometry.square_to_bit(row, column)
+            return mask
+        if self._legal_moves[token] is None:
+            if token == "X":
+                self._legal_moves[token] = self._geometry.legal_moves(self._black_bits, self._white_bits)
+            else:
+                self._legal_moves[token] = self._geometry.legal_moves(self._white_bits, self._black_bits)
+        return self._legal_moves[token]
+
+    def has_legal_move(self, token):
+        """returns True if token has at least one legal move"""
+        if self._backend == "bitboard":
+            return self.get_legal_mask(token) != 0
+        return len(self.get_legal_moves(token)) > 0
+
+    def _update_legal_moves(self):
+        """internal function that brings the list backend's legal move caches up to date after add_change_tokens"""
+        board = self.get_game_board()
+        affected = set()
+        for row, column in self._changed_squares:
+            affected.add((row, column))
+            for row_step, column_step in DIRECTIONS:
+                compare_row = row + row_step
+                compare_column = column + column_step
+                while board[compare_row][compare_column] == "X" or board[compare_row][compare_column] == "O":
+                    compare_row += row_step
+                    compare_column += column_step
+                if board[compare_row][compare_column] == ".":
+                    # squares past this empty square can't see the change, the line stops here
+                    affected.add((compare_row, compare_column))
+        self._changed_squares = []
+        for token, legal_moves in self._legal_moves.items():
+            if legal_moves is None:
+                continue
+            for position in affected:
+                if self.is_legal_move(position, token):
+                    legal_moves.add(position)
+                else:
+                    legal_moves.discard(position)
 
 
 class Player:
     """
     Represents a player in the game. Contains Player name (string) and Piece color (string): "black" or "white".
+    A computer player also has an engine, an object with a choose_move(game, piece_color) method (see search.py).
     """
-    def __init__(self, player_name, piece_color):
+    __slots__ = ("_player_name", "_piece_color", "_engine", "_token")
+
+    def __init__(self, player_name, piece_color, engine=None):
         self._player_name = player_name
         self._piece_color = piece_color
+        self._engine = engine  # None for a human player
         # color can be "black" or "white"
         if self._piece_color == "white":
             self._token = "O"
@@ -127,20 +370,31 @@ class Player:
         """returns players token, X or O"""
         return self._token
 
+    def get_engine(self):
+        """returns the engine that picks moves for a computer player, or None for a human player"""
+        return self._engine
+
 
 class Othello:
     """
     Object that represents the game as played.
     It contains information about the players and the board, so it must communicate with these classes.
     Access each position value on the board by ** self._board[row][column].
+    Passing backend="bitboard" makes return_available_positions and make_move use the bitboard engine.
+    board_size sets the size of the playing area, 8 for the standard 8x8 game.
     """
+    __slots__ = ("_board", "_player_list", "_black_player", "_white_player", "_move_history", "_redo_stack",
+                 "_analyzer")
 
-    def __init__(self):
-        self._board = Board()
+    def __init__(self, backend="list", board_size=8):
+        self._board = Board(board_size + 2, board_size + 2, backend)
         self._board.add_tokens_to_start_game()  # initializes the board with starting tokens
         self._player_list = []  # list of player objects
         self._black_player = None  # space holder for player object after player is created
         self._white_player = None  # space holder for player object after player is created
+        self._move_history = []  # MoveRecord for every move made, oldest first
+        self._redo_stack = []  # moves taken back with unmake_move, most recent last
+        self._analyzer = None  # analysis.MoveAnalyzer used for move hints, if one is set
 
     def look_up_player_by_color(self, piece_color):
         """internal function to return the Player object corresponding to the color"""
@@ -149,21 +403,75 @@ class Othello:
                 return player_object
         return None
 
-    def create_player(self, player_name, piece_color):
-        """ Creates a player object with the given name and color and adds it to the player list"""
+    def create_player(self, player_name, piece_color, engine=None):
+        """ Creates a player object with the given name and color and adds it to the player list. Passing an engine
+        (for example search.SearchEngine()) makes it a computer player that can move with play_computer_move"""
         if piece_color == "black":
-            self._black_player = Player(player_name, piece_color)
+            self._black_player = Player(player_name, piece_color, engine)
             self._player_list.append(self._black_player)
         if piece_color == "white":
-            self._white_player = Player(player_name, piece_color)
+            self._white_player = Player(player_name, piece_color, engine)
             self._player_list.append(self._white_player)
 
+    def get_board(self):
+        """returns the Board object"""
+        return self._board
+
+    def clone(self, keep_history=True):
+        """
+        returns a copy of the game that can be played on without changing this one. The players are shared. With
+        keep_history=False the copy starts with an empty move history, which makes the copy O(1)
+        """
+        game = Othello.__new__(Othello)
+        game._board = self._board.clone()
+        game._player_list = list(self._player_list)
+        game._black_player = self._black_player
+        game._white_player = self._white_player
+        game._analyzer = self._analyzer
+        if keep_history:
+            game._move_history = list(self._move_history)  # the MoveRecords are immutable and shared
+            game._redo_stack = list(self._redo_stack)
+        else:
+            game._move_history = []
+            game._redo_stack = []
+        return game
+
+    def set_analyzer(self, analyzer):
+        """sets the analysis.MoveAnalyzer used by get_move_hints and by play_game to suggest moves, None for none"""
+        self._analyzer = analyzer
+
+    def get_move_hints(self, piece_color, analyzer=None):
+        """
+        returns every legal move for piece_color ranked best first, as the list of move dictionaries from
+        MoveAnalyzer.analyze (position, score, principal variation). Uses the analyzer set with set_analyzer unless
+        one is passed. Raises ValueError if there is no analyzer.
+        """
+        if analyzer is None:
+            analyzer = self._analyzer
+        if analyzer is None:
+            raise ValueError("no move analyzer, pass one or call set_analyzer first")
+        return analyzer.analyze_game(self, piece_color)["moves"]
+
+    def snapshot(self):
+        """returns the board position as an immutable, hashable Snapshot, for example to use as a dictionary key"""
+        return self._board.snapshot()
+
+    def restore(self, snapshot):
+        """sets the board to the position in a Snapshot. The move history is cleared"""
+        self._board = Board.from_snapshot(snapshot, self._board.get_backend())
+        self._move_history = []
+        self._redo_stack = []
+
     def print_board(self):
         """Uses method from Board class to print out the board in 2d, including the boundaries"""
         print(self._board.display_board())
 
     def return_available_positions(self, piece_color, current=None, compare=None, direction=None, valid_moves=None):
-        """ Checks board for all possible positions for player to move, returns a list of these positions"""
+        """ Checks board for all possible positions for player to move, returns a list of these positions (without
+        duplicates)"""
+        if current is None and self._board.get_backend() == "bitboard":
+            return self._board.get_geometry().mask_to_squares(self._board.get_legal_mask(TOKENS[piece_color]))
+
         player = self.look_up_player_by_color(piece_color)  # instead, I could make an if statement
         # if piece_color = "white" player = self._white_player. I could also have used a dictionary instead of a list
         # for the player list where the keyword is "black" or "white" and the value is the player. The readme
@@ -196,6 +504,8 @@ class Othello:
                             self.return_available_positions(piece_color, current, (row-2, column-2), "diagonal up left", valid_moves)
                         if self._board.get_game_board()[row+1][column-1] == opponent.get_token():
                             self.return_available_positions(piece_color, current, (row+2, column-2), "diagonal down left", valid_moves)
+            # a square can be reached along more than one line, each position is only listed once
+            return list(dict.fromkeys(valid_moves))
 
         else:
             if self._board.get_game_board()[compare[0]][compare[1]] == ".":
@@ -228,6 +538,14 @@ class Othello:
 
         return valid_moves
 
+    def return_available_mask(self, piece_color):
+        """returns the legal moves for the given color as a bitboard mask"""
+        return self._board.get_legal_mask(TOKENS[piece_color])
+
+    def is_game_over(self):
+        """returns True when neither player has a legal move. Uses the board's cached legal moves"""
+        return not self._board.has_legal_move("X") and not self._board.has_legal_move("O")
+
     def return_winner(self):
         """
         Returns 'Winner is white player: player’s name' when white player wins the game.
@@ -247,9 +565,15 @@ class Othello:
     def make_move(self, color, piece_position, compare=None, direction=None, possible_flip=None):
         """
         Puts a piece of the specified color at the given position and updates the board accordingly, then returns
-        the current board (as a 2d list). This is an internal method and is meant to be called by play_game.
+        the current board (as a 2d list). With the bitboard backend returning the board builds the grid, use
+        apply_move to play without building it. This is an internal method and is meant to be called by play_game.
         Assumes only valid positions are passed.
         """
+        if compare is None:
+            if self._board.get_backend() == "bitboard":
+                self.apply_move(color, piece_position)
+                return self._board.get_game_board()
+            self._board.start_change_log()  # records the flips so the move can be taken back
 
         player = self.look_up_player_by_color(color)
         if player == self._black_player:
@@ -288,6 +612,7 @@ class Othello:
             if self._board.get_game_board()[row-1][column-1] == opponent.get_token():
                 possible_flip.append((row-1, column-1))
                 self.make_move(color, piece_position, [row-2, column-2], "diagonal up left", possible_flip)
+            self._record_move(color, piece_position)
 
         else:
             if self._board.get_game_board()[compare[0]][compare[1]] == player.get_token():
@@ -324,31 +649,118 @@ class Othello:
                 if direction == "diagonal down left":
                     self.make_move(color, piece_position, [compare[0] + 1, compare[1] - 1], "diagonal down left", possible_flip)
                 if direction == "diagonal up left":
-                    self.make_move(color, piece_position, [compare[0] - 1, compare[1] - 1], "diagonal down left", possible_flip)
+                    self.make_move(color, piece_position, [compare[0] - 1, compare[1] - 1], "diagonal up left", possible_flip)
 
         return self._board.get_game_board()
 
+    def _make_bitboard_move(self, color, piece_position):
+        """make_move for the bitboard backend. Only the placed square and the flipped squares are written to the board.
+        Returns the Board"""
+        token = TOKENS[color]
+        geometry = self._board.get_geometry()
+        black_bits, white_bits = self._board.get_bitboards()
+        move = geometry.square_to_bit(piece_position[0], piece_position[1])
+        if color == "black":
+            flipped = geometry.flipped_discs(black_bits, white_bits, move)
+        else:
+            flipped = geometry.flipped_discs(white_bits, black_bits, move)
+        self._board.add_change_tokens(piece_position, token)
+        for index in bitboard.iterate_bits(flipped):
+            self._board.add_change_tokens(geometry.bit_to_square(index), token)
+        return self._board
+
+    def _record_move(self, color, piece_position):
+        """internal function that turns the board's change log into a MoveRecord and adds it to the move history"""
+        position = self._board.get_geometry().get_square(piece_position[0], piece_position[1])
+        flipped = tuple(changed for changed in self._board.stop_change_log() if changed != position)
+        self._move_history.append(MoveRecord(color, position, flipped))
+        self._redo_stack.clear()  # a new move starts a new line, the undone moves can't be replayed anymore
+
+    def apply_move(self, color, piece_position):
+        """
+        makes the move like make_move, but returns the MoveRecord (position placed and positions flipped). With the
+        bitboard backend the board's grid isn't built, so this is the cheaper way to play a move
+        """
+        if self._board.get_backend() == "bitboard":
+            self._board.start_change_log()  # records the flips so the move can be taken back
+            self._make_bitboard_move(color, piece_position)
+            self._record_move(color, piece_position)
+        else:
+            self.make_move(color, piece_position)
+        return self._move_history[-1]
+
+    def unmake_move(self):
+        """
+        takes back the last move in the move history and returns its MoveRecord, or None if no moves have been made.
+        Only the placed and flipped squares are changed, so this is O(number of flips).
+        """
+        if not self._move_history:
+            return None
+        record = self._move_history.pop()
+        opponent_token = OPPONENT_TOKENS[TOKENS[record.color]]
+        for position in record.flipped:
+            self._board.add_change_tokens(position, opponent_token)
+        self._board.add_change_tokens(record.position, ".")
+        self._redo_stack.append(record)
+        return record
+
+    def redo_move(self):
+        """plays the last move taken back by unmake_move again and returns its MoveRecord, or None if there is none"""
+        if not self._redo_stack:
+            return None
+        record = self._redo_stack.pop()
+        token = TOKENS[record.color]
+        self._board.add_change_tokens(record.position, token)
+        for position in record.flipped:
+            self._board.add_change_tokens(position, token)
+        self._move_history.append(record)
+        return record
+
+    def rewind(self, number_moves=None):
+        """takes back number_moves moves (all of them by default). They can be replayed with redo_move"""
+        while self._move_history and (number_moves is None or number_moves > 0):
+            self.unmake_move()
+            if number_moves is not None:
+                number_moves -= 1
+
+    def get_move_history(self):
+        """returns the list of MoveRecords for the moves made so far, oldest first"""
+        return self._move_history
+
     def play_game(self, piece_color, piece_position):
         """ Checks if player with the given color can move to given position. If position is an invalid move, returns
-        "Invalid move", and prints "Here are the valid moves:" followed by a list of possible positions. If the position
+        "Invalid move", and prints "Here are the valid moves:" followed by a list of possible positions (and the best
+        three with their scores on an 8x8 board when an analyzer has been set with set_analyzer). If the position
         is valid, makes that move and updates the board and player's positions list. If the game is ended at that point,
         the function prints "Game is ended white piece: number  black piece: number" and calls the return_winner method.
         """
 
-        row = piece_position[0]
-        column = piece_position[1]
-        legal_move = False
-        for position in self.return_available_positions(piece_color):
-            if position == (row, column):
-                self.make_move(piece_color, piece_position)
-                # if position is a valid move, makes the move by placing player token and updating the board
-                legal_move = True
-
-        if not legal_move:
+        if (piece_position[0], piece_position[1]) not in self._board.get_legal_moves(TOKENS[piece_color]):
             # if the position is not a valid move, prints a list of valid moves and returns invalid move.
-            print("Here are the valid moves:", self.return_available_positions(piece_color))
+            print("Here are the valid moves:", sorted(self._board.get_legal_moves(TOKENS[piece_color])))
+            geometry = self._board.get_geometry()
+            standard_board = geometry.get_width() == 8 and geometry.get_height() == 8  # analysis only works on 8x8
+            if self._analyzer is not None and standard_board and self._board.has_legal_move(TOKENS[piece_color]):
+                hints = self.get_move_hints(piece_color)[:3]
+                print("Best moves:", ", ".join(str(hint["position"]) + " (" + format(hint["score"], ".0f") + ")"
+                                               for hint in hints))
             return "Invalid move"
 
-        if self.return_available_positions("black") == [] and self.return_available_positions("white") == []:
+        self.make_move(piece_color, piece_position)
+        # if position is a valid move, makes the move by placing player token and updating the board
+
+        if self.is_game_over():
             print("Game is ended white piece:", self._board.count_white_tokens(), "black piece:", self._board.count_black_tokens())
             self.return_winner()
+
+    def play_computer_move(self, piece_color):
+        """ Asks the engine of the computer player with the given color for a move and plays it with play_game.
+        Returns the position played, or None if the player has no valid move and has to pass."""
+        player = self.look_up_player_by_color(piece_color)
+        if player is None or player.get_engine() is None:
+            raise ValueError("there is no computer player for " + piece_color)
+        piece_position = player.get_engine().choose_move(self, piece_color)
+        if piece_position is None:
+            return None
+        self.play_game(piece_color, piece_position)
+        return piece_position
@@ -0,0 +1,196 @@
+# Author: Sonja Lavin
+# GitHub username: lavinso
+# Date: 10/18/26
+# Description: Move analysis for the 8x8 board. MoveAnalyzer scores every legal move of a position and returns them
+# ranked best first, each with its principal variation, for move hints and review. The root moves are split across
+# a pool of worker processes and searched one depth at a time until the wall clock budget runs out, so analysing one
+# position uses every core. Results are kept in an LRU cache keyed by the position's Zobrist hash, so asking for a
+# hint again in the same position is answered at once.
+
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import bitboard
+from search import WIN_SCORE, SearchEngine, SearchTimeout, zobrist_hash
+
+_worker_engines = {}  # table bits -> SearchEngine, one per worker process so the tables are reused between calls
+
+
+def score_move(player, opponent, color, depth, deadline, table_bits=16):
+    """
+    searches the position after a root move, with player (color 0 for black, 1 for white) to move, to depth plies.
+    deadline is a time.time() value shared by every worker. Returns the score_position dictionary, or None if the
+    deadline passed first. Runs in the worker processes.
+    """
+    engine = _worker_engines.get(table_bits)
+    if engine is None:
+        engine = _worker_engines[table_bits] = SearchEngine(table_bits=table_bits)
+    time_limit = deadline - time.time()
+    if time_limit <= 0:
+        return None
+    engine.set_time_limit(time_limit)
+    try:
+        return engine.score_position(player, opponent, color, depth)
+    except SearchTimeout:
+        return None
+
+
+class MoveAnalyzer:
+    """
+    Ranks every legal move of a position. Each analysis searches all root moves to depth 1, then 2, and so on, in
+    parallel on workers processes (all cores by default, 1 searches in this process), and keeps the last depth that
+    every move finished within time_budget seconds. The last cache_size analyses are cached. Call close (or use a
+    with statement) to stop the worker processes. An analysis is only cached once at least depth 1 finished, and a
+    cached one is searched again when a larger time budget is asked for, unless every move was already solved.
+    """
+    def __init__(self, time_budget=1.0, workers=None, max_depth=60, cache_size=1024, table_bits=16):
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self._time_budget = time_budget
+        self._workers = workers
+        self._max_depth = max_depth
+        self._cache_size = cache_size
+        self._table_bits = table_bits
+        self._executor = None  # started on the first analysis that needs it
+        self._cache = OrderedDict()  # Zobrist hash -> (player, opponent, time budget, analysis), least recent first
+        self._hits = 0
+        self._misses = 0
+
+    def get_cache_statistics(self):
+        """returns a dictionary with the number of cached positions, cache hits and cache misses"""
+        return {"entries": len(self._cache), "hits": self._hits, "misses": self._misses}
+
+    def clear_cache(self):
+        """forgets every cached analysis"""
+        self._cache.clear()
+
+    def analyze_game(self, game, piece_color, time_budget=None):
+        """analyses the position in an Othello game for piece_color, see analyze"""
+        geometry = game.get_board().get_geometry()
+        if geometry.get_width() != 8 or geometry.get_height() != 8:
+            raise ValueError("move analysis only works on the standard 8x8 board")
+        black_bits, white_bits = game.get_board().get_bitboards()
+        if piece_color == "black":
+            return self.analyze(black_bits, white_bits, 0, time_budget)
+        return self.analyze(white_bits, black_bits, 1, time_budget)
+
+    def analyze(self, player, opponent, color, time_budget=None):
+        """
+        analyses the position with player to move (color 0 for black, 1 for white) and returns a dictionary with
+        "moves", a list with a dictionary for every legal move, best first: its bit index ("move"), padded
+        (row, column) "position", "score" for player, "difference" (the exact final disc difference when the search
+        reached the end of the game, else None) and "pv", the expected line as padded positions with None for a pass.
+        The dictionary also has the "depth" every move was searched to, the "nodes" searched, the "elapsed" time and
+        "cached", True when the analysis came from the cache.
+        """
+        if time_budget is None:
+            time_budget = self._time_budget
+        key = zobrist_hash(*((player, opponent) if color == 0 else (opponent, player)), color)
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] == player and cached[1] == opponent:
+            solved = all(analysed["difference"] is not None for analysed in cached[3]["moves"])
+            if time_budget <= cached[2] or solved:
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return dict(cached[3], cached=True)
+        self._misses += 1
+
+        analysis = self._search(player, opponent, color, time_budget)
+        if analysis["depth"] > 0:  # the disc difference fallback isn't worth keeping
+            self._cache[key] = (player, opponent, time_budget, analysis)
+            self._cache.move_to_end(key)
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return dict(analysis, cached=False)
+
+    def _search(self, player, opponent, color, time_budget):
+        """internal function that runs the analysis, see analyze"""
+        start = time.perf_counter()
+        deadline = time.time() + time_budget
+        children = []  # (move, player to move after it, the other side)
+        for move in bitboard.iterate_bits(bitboard.legal_moves(player, opponent)):
+            flipped = bitboard.flipped_discs(player, opponent, move)
+            children.append((move, opponent ^ flipped, player | flipped | (1 << move)))
+
+        results = None  # score_position results of the last depth every move finished
+        completed_depth = 0
+        nodes = 0
+        empties = 64 - (player | opponent).bit_count()
+        for depth in range(1, min(self._max_depth, empties) + 1):
+            round_results = self._search_children(children, 1 - color, depth - 1, deadline)
+            nodes += sum(result["nodes"] for result in round_results if result is not None)
+            if None in round_results:
+                break
+            results = round_results
+            completed_depth = depth
+            if all(abs(result["score"]) >= WIN_SCORE for result in results):
+                break  # every line reaches the end of the game, searching deeper changes nothing
+            if time.time() >= deadline:
+                break
+
+        moves = []
+        for index, (move, child_player, child_opponent) in enumerate(children):
+            if results is None:  # not even depth 1 finished, fall back to the disc difference
+                score = child_opponent.bit_count() - child_player.bit_count()
+                line = []
+            else:
+                score = -results[index]["score"]
+                line = results[index]["pv"]
+            difference = None
+            if abs(score) >= WIN_SCORE:
+                difference = score - WIN_SCORE if score > 0 else score + WIN_SCORE
+            elif completed_depth >= empties:
+                difference = 0  # every line was searched to the end, so a score of 0 is a draw
+            moves.append({
+                "move": move,
+                "position": bitboard.bit_to_square(move),
+                "score": score,
+                "difference": difference,
+                "pv": [bitboard.bit_to_square(move)] + [None if pv_move is None else bitboard.bit_to_square(pv_move)
+                                                        for pv_move in line],
+            })
+        moves.sort(key=lambda analysed: analysed["score"], reverse=True)
+        return {
+            "moves": moves,
+            "depth": completed_depth,
+            "nodes": nodes,
+            "elapsed": time.perf_counter() - start,
+        }
+
+    def _search_children(self, children, color, depth, deadline):
+        """
+        internal function that searches the position after every root move to depth, on the worker processes when
+        there is more than one. Returns the results in the order of children, None where the deadline passed first.
+        """
+        if self._workers <= 1 or len(children) <= 1:
+            return [score_move(child_player, child_opponent, color, depth, deadline, self._table_bits)
+                    for _, child_player, child_opponent in children]
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self._workers)
+        futures = [self._executor.submit(score_move, child_player, child_opponent, color, depth, deadline,
+                                         self._table_bits)
+                   for _, child_player, child_opponent in children]
+        # searches check the clock every 1024 nodes, the grace period covers the last check and the result's trip back
+        wait(futures, timeout=max(0.0, deadline - time.time()) + 0.5)
+        results = []
+        for future in futures:
+            if future.done() and not future.cancelled():
+                results.append(future.result())
+            else:
+                future.cancel()
+                results.append(None)
+        return results
+
+    def close(self):
+        """stops the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
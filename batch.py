@@ -0,0 +1,151 @@
+# Author: Sonja Lavin
+# GitHub username: lavinso
+# Date: 10/18/26
+# Description: Batched move generation with NumPy. Positions are given as arrays of 64-bit masks (one entry per
+# board, laid out like bitboard.py) or as N x 8 x 8 arrays, and legal moves and the boards after each move are
+# computed for all of them at once. The results follow the same rules as Othello.make_move, so they can be checked
+# against it square by square. NumPy is only needed by this module.
+
+try:
+    import numpy
+except ImportError:  # the rest of the project works without numpy
+    numpy = None
+
+EMPTY = 0  # values used in N x 8 x 8 board arrays
+BLACK = 1
+WHITE = 2
+
+# (shift, whether the shift is toward higher bits, masks the run of opponent discs to the inner columns)
+_DIRECTIONS = (
+    (1, True, True),    # right
+    (1, False, True),   # left
+    (8, True, False),   # down
+    (8, False, False),  # up
+    (9, True, True),    # diagonal down right
+    (9, False, True),   # diagonal up left
+    (7, True, True),    # diagonal down left
+    (7, False, True),   # diagonal up right
+)
+
+
+def _require_numpy():
+    """internal function that raises ImportError with a helpful message when numpy isn't installed"""
+    if numpy is None:
+        raise ImportError("batch move generation needs numpy, install it with: pip install numpy")
+
+
+def _shift(masks, amount, up):
+    """internal function that shifts every mask toward higher bits (up=True) or lower bits. Bits past 63 are dropped"""
+    if up:
+        return numpy.left_shift(masks, numpy.uint64(amount))
+    return numpy.right_shift(masks, numpy.uint64(amount))
+
+
+def boards_to_bitboards(boards):
+    """
+    converts an N x 8 x 8 array (EMPTY, BLACK or WHITE in each square, row 0 column 0 first) to a pair of uint64
+    arrays (black, white)
+    """
+    _require_numpy()
+    squares = numpy.asarray(boards).reshape(-1, 64)
+    weights = numpy.left_shift(numpy.uint64(1), numpy.arange(64, dtype=numpy.uint64))
+    black = numpy.bitwise_or.reduce(numpy.where(squares == BLACK, weights, numpy.uint64(0)), axis=1)
+    white = numpy.bitwise_or.reduce(numpy.where(squares == WHITE, weights, numpy.uint64(0)), axis=1)
+    return black.astype(numpy.uint64), white.astype(numpy.uint64)
+
+
+def bitboards_to_boards(black, white):
+    """converts a pair of uint64 mask arrays back to an N x 8 x 8 uint8 array of EMPTY, BLACK and WHITE"""
+    _require_numpy()
+    bits = numpy.arange(64, dtype=numpy.uint64)
+    black_squares = (numpy.right_shift(numpy.asarray(black, dtype=numpy.uint64)[:, None], bits) & numpy.uint64(1))
+    white_squares = (numpy.right_shift(numpy.asarray(white, dtype=numpy.uint64)[:, None], bits) & numpy.uint64(1))
+    boards = black_squares.astype(numpy.uint8) * BLACK + white_squares.astype(numpy.uint8) * WHITE
+    return boards.reshape(-1, 8, 8)
+
+
+def count_bits(masks):
+    """returns an int64 array with the number of bits set in each uint64 mask"""
+    _require_numpy()
+    masks = numpy.ascontiguousarray(masks, dtype=numpy.uint64)
+    return numpy.unpackbits(masks.view(numpy.uint8).reshape(-1, 8), axis=1).sum(axis=1, dtype=numpy.int64)
+
+
+def legal_moves(player, opponent):
+    """returns a uint64 array with the legal move mask of every (player, opponent) position"""
+    _require_numpy()
+    player = numpy.asarray(player, dtype=numpy.uint64)
+    opponent = numpy.asarray(opponent, dtype=numpy.uint64)
+    inner = opponent & numpy.uint64(0x7E7E7E7E7E7E7E7E)
+    moves = numpy.zeros_like(player)
+    for amount, up, use_inner in _DIRECTIONS:
+        mask = inner if use_inner else opponent
+        run = mask & _shift(player, amount, up)
+        run |= mask & _shift(run, amount, up)
+        pairs = mask & _shift(mask, amount, up)
+        run |= pairs & _shift(run, 2 * amount, up)
+        run |= pairs & _shift(run, 2 * amount, up)
+        moves |= _shift(run, amount, up)
+    return moves & ~(player | opponent)
+
+
+def flipped_discs(player, opponent, moves):
+    """
+    returns a uint64 array with the discs flipped when each player places a disc on the square with bit index moves[i].
+    A move that captures nothing flips nothing.
+    """
+    _require_numpy()
+    player = numpy.asarray(player, dtype=numpy.uint64)
+    opponent = numpy.asarray(opponent, dtype=numpy.uint64)
+    move_bits = numpy.left_shift(numpy.uint64(1), numpy.asarray(moves, dtype=numpy.uint64))
+    inner = opponent & numpy.uint64(0x7E7E7E7E7E7E7E7E)
+    flipped = numpy.zeros_like(player)
+    zero = numpy.uint64(0)
+    for amount, up, use_inner in _DIRECTIONS:
+        mask = inner if use_inner else opponent
+        run = mask & _shift(move_bits, amount, up)  # the unbroken line of opponent discs next to the move
+        for _ in range(5):
+            run |= mask & _shift(run, amount, up)
+        # the line is captured when the square just past it holds one of the player's discs
+        flipped |= numpy.where((_shift(run, amount, up) & player) != zero, run, zero)
+    return flipped
+
+
+def play_moves(player, opponent, moves):
+    """
+    plays moves[i] for player on every position and returns (new_player, new_opponent, flipped) uint64 arrays.
+    Assumes every move is legal, like Othello.make_move.
+    """
+    _require_numpy()
+    player = numpy.asarray(player, dtype=numpy.uint64)
+    opponent = numpy.asarray(opponent, dtype=numpy.uint64)
+    flipped = flipped_discs(player, opponent, moves)
+    move_bits = numpy.left_shift(numpy.uint64(1), numpy.asarray(moves, dtype=numpy.uint64))
+    return player | flipped | move_bits, opponent ^ flipped, flipped
+
+
+def expand_positions(player, opponent):
+    """
+    generates every legal move of every position in one call. Returns a dictionary of arrays:
+    "legal": the legal move mask of each of the N positions,
+    "position": for each generated move, the index of the position it was played in,
+    "move": the bit index of the move,
+    "player" and "opponent": the masks after the move (still from the point of view of the player who moved),
+    "flipped": the discs the move flipped.
+    """
+    _require_numpy()
+    player = numpy.asarray(player, dtype=numpy.uint64)
+    opponent = numpy.asarray(opponent, dtype=numpy.uint64)
+    legal = legal_moves(player, opponent)
+    bits = numpy.arange(64, dtype=numpy.uint64)
+    move_table = (numpy.right_shift(legal[:, None], bits) & numpy.uint64(1)) != 0
+    position_index, move = numpy.nonzero(move_table)
+    new_player, new_opponent, flipped = play_moves(player[position_index], opponent[position_index], move)
+    return {
+        "legal": legal,
+        "position": position_index,
+        "move": move,
+        "player": new_player,
+        "opponent": new_opponent,
+        "flipped": flipped,
+    }
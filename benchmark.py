@@ -0,0 +1,393 @@
+# Author: Sonja Lavin
+# GitHub username: lavinso
+# Date: 10/18/26
+# Description: Benchmarks for the Othello engine: perft node counts, micro-benchmarks of the hot methods, full game
+# throughput and scaling with the board size. Run "python benchmark.py --help" for the options. Results are written
+# as JSON so runs can be saved and compared, optionally with a per-method profile of the Othello class.
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import bitboard
+from Othello import TOKENS, Othello
+from profiling import profile_othello
+
+# known perft node counts from the start position for depths 1 to 9, passes count as a move
+PERFT_COUNTS = (4, 12, 56, 244, 1396, 8200, 55092, 390216, 3005288)
+
+
+def random_positions(board_size, count, seed=0):
+    """
+    returns count (player, opponent) mask pairs taken from random games on a board_size x board_size board, spread
+    over the whole game
+    """
+    geometry = bitboard.BitboardGeometry(board_size, board_size)
+    generator = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        player, opponent = geometry.start_position()
+        while True:
+            moves = geometry.legal_moves(player, opponent)
+            if not moves:
+                if not geometry.legal_moves(opponent, player):
+                    break
+                player, opponent = opponent, player
+                continue
+            positions.append((player, opponent))
+            move = generator.choice(list(bitboard.iterate_bits(moves)))
+            player, opponent, flipped = geometry.play_move(player, opponent, move)
+            player, opponent = opponent, player
+    generator.shuffle(positions)
+    return positions[:count]
+
+
+def time_per_call(function, arguments, minimum_time=0.2):
+    """
+    calls function(*argument) for every tuple in arguments, repeating the whole list until minimum_time seconds have
+    passed, and returns the average time per call in microseconds
+    """
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        for argument in arguments:
+            function(*argument)
+        calls += len(arguments)
+        elapsed = time.perf_counter() - start
+        if elapsed >= minimum_time:
+            return elapsed / calls * 1e6
+
+
+def time_random_games(backend, board_size, number_games, seed=0):
+    """plays number_games random games through the Othello class and returns the number of games per second"""
+    generator = random.Random(seed)
+    start = time.perf_counter()
+    for _ in range(number_games):
+        game = Othello(backend=backend, board_size=board_size)
+        game.create_player("black", "black")
+        game.create_player("white", "white")
+        board = game.get_board()
+        piece_color = "black"
+        while not game.is_game_over():
+            legal_moves = board.get_legal_moves(TOKENS[piece_color])
+            if legal_moves:
+                game.make_move(piece_color, generator.choice(sorted(legal_moves)))
+            piece_color = "white" if piece_color == "black" else "black"
+    return number_games / (time.perf_counter() - start)
+
+
+def perft(player, opponent, depth, passed=False):
+    """
+    returns the number of leaf positions depth moves ahead of the position with player to move, using the bitboard
+    functions directly. A pass counts as a move and a finished game counts as one leaf.
+    """
+    if depth == 0:
+        return 1
+    moves = bitboard.legal_moves(player, opponent)
+    if not moves:
+        if passed:
+            return 1
+        return perft(opponent, player, depth - 1, True)
+    if depth == 1:
+        return moves.bit_count()
+    nodes = 0
+    for move in bitboard.iterate_bits(moves):
+        flipped = bitboard.flipped_discs(player, opponent, move)
+        nodes += perft(opponent ^ flipped, player | flipped | (1 << move), depth - 1)
+    return nodes
+
+
+def perft_game(game, piece_color, depth, passed=False):
+    """
+    perft through the Othello API: legal moves come from the board's cache, and each move is made with apply_move
+    and taken back with unmake_move
+    """
+    if depth == 0:
+        return 1
+    other_color = "white" if piece_color == "black" else "black"
+    legal_moves = game.get_board().get_legal_moves(TOKENS[piece_color])
+    if not legal_moves:
+        if passed:
+            return 1
+        return perft_game(game, other_color, depth - 1, True)
+    if depth == 1:
+        return len(legal_moves)
+    nodes = 0
+    for piece_position in sorted(legal_moves):
+        game.apply_move(piece_color, piece_position)
+        nodes += perft_game(game, other_color, depth - 1)
+        game.unmake_move()
+    return nodes
+
+
+def benchmark_perft(depth=6, api_depth=5):
+    """
+    runs perft from the start position with the bitboard functions to depth and through the Othello API with each
+    backend to api_depth. Returns a list of dictionaries with the node count, whether it matches the known count,
+    the time and the nodes per second.
+    """
+    results = []
+    runs = [("bitboard functions", depth, None)]
+    for backend in ("bitboard", "list"):
+        runs.append(("Othello " + backend, api_depth, backend))
+    for name, run_depth, backend in runs:
+        start = time.perf_counter()
+        if backend is None:
+            nodes = perft(bitboard.BLACK_START, bitboard.WHITE_START, run_depth)
+        else:
+            game = Othello(backend=backend)
+            game.create_player("black", "black")
+            game.create_player("white", "white")
+            nodes = perft_game(game, "black", run_depth)
+        elapsed = time.perf_counter() - start
+        results.append({
+            "engine": name,
+            "depth": run_depth,
+            "nodes": nodes,
+            "correct": run_depth > len(PERFT_COUNTS) or nodes == PERFT_COUNTS[run_depth - 1],
+            "seconds": elapsed,
+            "nodes_per_second": nodes / elapsed if elapsed > 0 else 0.0,
+        })
+    return results
+
+
+def random_games_in_progress(backend, count, seed=0):
+    """returns count (game, piece color to move) pairs from random games at every stage, color to move has a move"""
+    generator = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        stop = generator.randrange(0, 58)
+        game = Othello(backend=backend)
+        game.create_player("black", "black")
+        game.create_player("white", "white")
+        piece_color = "black"
+        for _ in range(stop):
+            if game.is_game_over():
+                break
+            legal_moves = game.get_board().get_legal_moves(TOKENS[piece_color])
+            if legal_moves:
+                game.make_move(piece_color, generator.choice(sorted(legal_moves)))
+            piece_color = "white" if piece_color == "black" else "black"
+        if game.get_board().has_legal_move(TOKENS[piece_color]):
+            positions.append((game, piece_color))
+    return positions
+
+
+def _make_and_unmake(game, piece_color, piece_position):
+    """internal function timed by the micro-benchmarks"""
+    game.apply_move(piece_color, piece_position)
+    game.unmake_move()
+
+
+def _make_query_unmake(game, piece_color, piece_position):
+    """internal function timed by the micro-benchmarks, includes bringing the legal move caches up to date"""
+    game.apply_move(piece_color, piece_position)
+    game.get_board().get_legal_moves("X")
+    game.get_board().get_legal_moves("O")
+    game.unmake_move()
+
+
+def _count_tokens(board):
+    """internal function timed by the micro-benchmarks"""
+    return board.count_black_tokens(), board.count_white_tokens()
+
+
+def benchmark_micro(number_positions=100):
+    """
+    returns a dictionary of microseconds per call for the hot paths: the raw bitboard functions, and for each backend
+    return_available_positions, a make_move/unmake_move pair, a move followed by both legal move queries, and the
+    two count methods
+    """
+    results = {}
+    positions = random_positions(8, number_positions)
+    moves = []
+    for player, opponent in positions:
+        for move in bitboard.iterate_bits(bitboard.legal_moves(player, opponent)):
+            moves.append((player, opponent, move))
+    results["bitboard.legal_moves"] = time_per_call(bitboard.legal_moves, positions)
+    results["bitboard.flipped_discs"] = time_per_call(bitboard.flipped_discs, moves)
+    for backend in ("bitboard", "list"):
+        games = random_games_in_progress(backend, number_positions)
+        game_moves = [(game, piece_color, min(game.get_board().get_legal_moves(TOKENS[piece_color])))
+                      for game, piece_color in games]
+        results[backend + ".return_available_positions"] = time_per_call(
+            Othello.return_available_positions, games)
+        results[backend + ".make_unmake"] = time_per_call(_make_and_unmake, game_moves)
+        results[backend + ".make_query_unmake"] = time_per_call(_make_query_unmake, game_moves)
+        results[backend + ".count_tokens"] = time_per_call(_count_tokens, [(game.get_board(),) for game, _ in games])
+    return results
+
+
+def time_play_game_games(backend, number_games, seed=0):
+    """plays number_games random games through play_game and returns games per second. The printed output is dropped"""
+    generator = random.Random(seed)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(number_games):
+            game = Othello(backend=backend)
+            game.create_player("black", "black")
+            game.create_player("white", "white")
+            piece_color = "black"
+            while not game.is_game_over():
+                legal_moves = game.return_available_positions(piece_color)
+                if legal_moves:
+                    game.play_game(piece_color, generator.choice(sorted(set(legal_moves))))
+                piece_color = "white" if piece_color == "black" else "black"
+    return number_games / (time.perf_counter() - start)
+
+
+def benchmark_games(number_games=20):
+    """returns random games per second for each backend, driven through make_move and through play_game"""
+    results = {}
+    for backend in ("bitboard", "list"):
+        results[backend + ".make_move_games_per_second"] = time_random_games(backend, 8, number_games)
+        results[backend + ".play_game_games_per_second"] = time_play_game_games(backend, number_games)
+    return results
+
+
+def _bytes_per_object(make_object, count):
+    """internal function that returns the average bytes allocated by make_object(index), over count live objects"""
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        objects = [make_object(index) for index in range(count)]
+        used = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+    del objects
+    return used / count
+
+
+def measure_game_memory(number_games=1000, number_moves=20):
+    """
+    returns the average bytes per live game for each backend, measured with tracemalloc: a new game, a game after
+    number_moves random moves (with its move history), the same game once its grid has been built, a clone of it
+    without the history, and a Snapshot of it
+    """
+    results = {}
+    for backend in ("bitboard", "list"):
+        games = [game for game, _ in random_games_in_progress(backend, number_games, seed=number_moves)]
+
+        def played(index):
+            generator = random.Random(index)
+            game = Othello(backend=backend)
+            game.create_player("black", "black")
+            game.create_player("white", "white")
+            piece_color = "black"
+            for _ in range(number_moves):
+                legal_moves = game.get_board().get_legal_moves(TOKENS[piece_color])
+                if legal_moves:
+                    game.apply_move(piece_color, generator.choice(sorted(legal_moves)))
+                piece_color = "white" if piece_color == "black" else "black"
+            return game
+
+        def with_grid(index):
+            game = played(index)
+            game.get_board().get_game_board()
+            return game
+
+        results[backend] = {
+            "new_game": _bytes_per_object(lambda index: Othello(backend=backend), number_games),
+            "after_moves": _bytes_per_object(played, number_games),
+            "after_moves_with_grid": _bytes_per_object(with_grid, number_games),
+            "clone": _bytes_per_object(lambda index: games[index].clone(keep_history=False), number_games),
+            "snapshot": _bytes_per_object(lambda index: games[index].snapshot(), number_games),
+        }
+    return results
+
+
+def benchmark_board_sizes(sizes=(8, 10, 12, 16), number_positions=200, number_games=5):
+    """
+    measures how the cost of move generation, flipping and whole games grows with the board size. Returns a list with
+    one dictionary per size: microseconds per legal_moves and flipped_discs call (for 8x8 both the fast 64-bit
+    functions and the generic ones), and random games per second with each backend.
+    """
+    results = []
+    for size in sizes:
+        geometry = bitboard.BitboardGeometry(size, size)
+        positions = random_positions(size, number_positions)
+        moves = []
+        for player, opponent in positions:
+            for move in bitboard.iterate_bits(geometry.legal_moves(player, opponent)):
+                moves.append((player, opponent, move))
+        result = {
+            "board_size": size,
+            "legal_moves_us": time_per_call(bitboard.BitboardGeometry.legal_moves,
+                                            [(geometry, player, opponent) for player, opponent in positions]),
+            "flipped_discs_us": time_per_call(bitboard.BitboardGeometry.flipped_discs,
+                                              [(geometry,) + move for move in moves]),
+            "bitboard_games_per_second": time_random_games("bitboard", size, number_games),
+            "list_games_per_second": time_random_games("list", size, number_games),
+        }
+        if size == 8:
+            result["fast_legal_moves_us"] = time_per_call(bitboard.legal_moves, positions)
+            result["fast_flipped_discs_us"] = time_per_call(bitboard.flipped_discs, moves)
+        results.append(result)
+    return results
+
+
+SUITES = ("perft", "micro", "games", "memory", "sizes")
+
+
+def run_suites(suites, options):
+    """runs the named suites with the command line options and returns their results in a dictionary"""
+    results = {}
+    if "perft" in suites:
+        results["perft"] = benchmark_perft(options.perft_depth, options.api_perft_depth)
+    if "micro" in suites:
+        results["micro"] = benchmark_micro(options.positions)
+    if "games" in suites:
+        results["games"] = benchmark_games(options.games)
+    if "memory" in suites:
+        results["memory_bytes_per_game"] = measure_game_memory(options.memory_games, options.memory_moves)
+    if "sizes" in suites:
+        results["board_sizes"] = benchmark_board_sizes(options.sizes, options.positions, options.games)
+    return results
+
+
+def main(arguments=None):
+    """command line entry point, writes the results as JSON to standard output or --output"""
+    parser = argparse.ArgumentParser(description="Benchmark the Othello engine")
+    parser.add_argument("--suites", nargs="+", choices=SUITES, default=list(SUITES), help="benchmarks to run")
+    parser.add_argument("--perft-depth", type=int, default=6, help="perft depth for the bitboard functions")
+    parser.add_argument("--api-perft-depth", type=int, default=5, help="perft depth through the Othello class")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 10, 12, 16],
+                        help="board sizes for the board size benchmark")
+    parser.add_argument("--positions", type=int, default=200, help="positions used for the move generation timings")
+    parser.add_argument("--games", type=int, default=5, help="random games played for each game benchmark")
+    parser.add_argument("--memory-games", type=int, default=1000, help="live games for the memory measurement")
+    parser.add_argument("--memory-moves", type=int, default=20, help="moves played in each game for the memory suite")
+    parser.add_argument("--profile", action="store_true",
+                        help="also record call counts and time for every Othello and Board method, in a second "
+                             "pass after the timed one")
+    parser.add_argument("--output", help="file to write the JSON results to")
+    options = parser.parse_args(arguments)
+
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    results.update(run_suites(options.suites, options))
+    if options.profile:
+        # a separate pass, so the wrapper overhead doesn't end up in the timings above
+        with profile_othello(include_board=True) as profiler:
+            run_suites([suite for suite in options.suites if suite != "memory"], options)
+        results["profile"] = profiler.get_report()
+
+    if options.output:
+        with open(options.output, "w") as output:
+            json.dump(results, output, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
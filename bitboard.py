@@ -0,0 +1,373 @@
+# Author: Sonja Lavin
+# GitHub username: lavinso
+# Date: 10/18/26
+# Description: Bitboard engine for Othello. The 8x8 playing area is stored as two 64-bit masks, one for black and one
+# for white. Bit 0 is the top left playing square, padded position (1, 1), and bit 63 is the bottom right, padded
+# position (8, 8). Move generation and flipping are done with shifts and masks instead of walking the board.
+# The module level functions are the fast path for the standard 8x8 board. BitboardGeometry does the same for any
+# width and height, using Python ints as bitsets that are width * height bits wide.
+
+FULL_BOARD = 0xFFFFFFFFFFFFFFFF
+NOT_A_FILE = 0xFEFEFEFEFEFEFEFE  # every square except the left column
+NOT_H_FILE = 0x7F7F7F7F7F7F7F7F  # every square except the right column
+
+BLACK_START = (1 << 28) | (1 << 35)  # padded positions (4, 5) and (5, 4)
+WHITE_START = (1 << 27) | (1 << 36)  # padded positions (4, 4) and (5, 5)
+
+
+def square_to_bit(row, column):
+    """returns the bit index of a padded (row, column) position. Row 1 column 1 is bit 0"""
+    return (row - 1) * 8 + (column - 1)
+
+
+def bit_to_square(index):
+    """returns the padded (row, column) position of a bit index"""
+    return index // 8 + 1, index % 8 + 1
+
+
+def iterate_bits(mask):
+    """yields the index of every bit set in mask, lowest bit first"""
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+def mask_to_squares(mask):
+    """returns a list of the padded (row, column) positions set in mask, in row major order"""
+    return [(index // 8 + 1, index % 8 + 1) for index in iterate_bits(mask)]
+
+
+def count_bits(mask):
+    """returns the number of squares set in mask"""
+    return mask.bit_count()
+
+
+def legal_moves(player, opponent):
+    """
+    returns a mask of every empty square where player can move. Each of the 8 directions grows a run of opponent discs
+    out from the player's discs, doubling the step once two in a row are known (at most 6 in a row fit on the board),
+    and keeps the squares just past the end of the run. The opponent mask is trimmed of the edge columns for the
+    sideways directions so a run can't wrap from one row onto the next.
+    """
+    inner = opponent & 0x7E7E7E7E7E7E7E7E
+    moves = 0
+
+    # right
+    run = inner & (player << 1)
+    run |= inner & (run << 1)
+    pairs = inner & (inner << 1)
+    run |= pairs & (run << 2)
+    run |= pairs & (run << 2)
+    moves |= run << 1
+    # left
+    run = inner & (player >> 1)
+    run |= inner & (run >> 1)
+    pairs = inner & (inner >> 1)
+    run |= pairs & (run >> 2)
+    run |= pairs & (run >> 2)
+    moves |= run >> 1
+    # down
+    run = opponent & (player << 8)
+    run |= opponent & (run << 8)
+    pairs = opponent & (opponent << 8)
+    run |= pairs & (run << 16)
+    run |= pairs & (run << 16)
+    moves |= run << 8
+    # up
+    run = opponent & (player >> 8)
+    run |= opponent & (run >> 8)
+    pairs = opponent & (opponent >> 8)
+    run |= pairs & (run >> 16)
+    run |= pairs & (run >> 16)
+    moves |= run >> 8
+    # diagonal down right
+    run = inner & (player << 9)
+    run |= inner & (run << 9)
+    pairs = inner & (inner << 9)
+    run |= pairs & (run << 18)
+    run |= pairs & (run << 18)
+    moves |= run << 9
+    # diagonal up left
+    run = inner & (player >> 9)
+    run |= inner & (run >> 9)
+    pairs = inner & (inner >> 9)
+    run |= pairs & (run >> 18)
+    run |= pairs & (run >> 18)
+    moves |= run >> 9
+    # diagonal down left
+    run = inner & (player << 7)
+    run |= inner & (run << 7)
+    pairs = inner & (inner << 7)
+    run |= pairs & (run << 14)
+    run |= pairs & (run << 14)
+    moves |= run << 7
+    # diagonal up right
+    run = inner & (player >> 7)
+    run |= inner & (run >> 7)
+    pairs = inner & (inner >> 7)
+    run |= pairs & (run >> 14)
+    run |= pairs & (run >> 14)
+    moves |= run >> 7
+
+    return moves & ~(player | opponent) & FULL_BOARD
+
+
+# (shift, mask) for each direction. A positive shift moves toward higher bits. The mask is applied after shifting and
+# removes squares that wrapped around to the other side of the board.
+_DIRECTIONS = (
+    (1, NOT_A_FILE),    # right
+    (-1, NOT_H_FILE),   # left
+    (8, FULL_BOARD),    # down
+    (-8, FULL_BOARD),   # up
+    (9, NOT_A_FILE),    # diagonal down right
+    (-9, NOT_H_FILE),   # diagonal up left
+    (7, NOT_H_FILE),    # diagonal down left
+    (-7, NOT_A_FILE),   # diagonal up right
+)
+
+
+def flipped_discs(player, opponent, move):
+    """
+    returns a mask of the opponent discs that flip when player places a disc on the square with bit index move.
+    Returns 0 if the move does not capture anything.
+    """
+    flipped = 0
+    for shift, edge_mask in _DIRECTIONS:
+        line = 0
+        if shift > 0:
+            square = ((1 << move) << shift) & edge_mask & FULL_BOARD
+            while square & opponent:
+                line |= square
+                square = (square << shift) & edge_mask & FULL_BOARD
+        else:
+            square = ((1 << move) >> -shift) & edge_mask
+            while square & opponent:
+                line |= square
+                square = (square >> -shift) & edge_mask
+        if square & player:
+            flipped |= line
+    return flipped
+
+
+def play_move(player, opponent, move):
+    """
+    places a disc for player on bit index move and returns the new (player, opponent) masks along with the mask of
+    flipped discs. Assumes the move is legal.
+    """
+    flipped = flipped_discs(player, opponent, move)
+    return player | flipped | (1 << move), opponent ^ flipped, flipped
+
+
+_REVERSED_BYTES = bytes(int(format(value, "08b")[::-1], 2) for value in range(256))
+
+
+def flip_vertical(mask):
+    """returns the 8x8 mask flipped top to bottom"""
+    return int.from_bytes(mask.to_bytes(8, "little"), "big")
+
+
+def mirror_horizontal(mask):
+    """returns the 8x8 mask flipped left to right"""
+    return int.from_bytes(mask.to_bytes(8, "little").translate(_REVERSED_BYTES), "little")
+
+
+def flip_diagonal(mask):
+    """returns the 8x8 mask flipped over the diagonal from the top left to the bottom right corner"""
+    swap = 0x0F0F0F0F00000000 & (mask ^ (mask << 28))
+    mask ^= swap ^ (swap >> 28)
+    swap = 0x3333000033330000 & (mask ^ (mask << 14))
+    mask ^= swap ^ (swap >> 14)
+    swap = 0x5500550055005500 & (mask ^ (mask << 7))
+    mask ^= swap ^ (swap >> 7)
+    return mask
+
+
+def _identity(mask):
+    """returns the mask unchanged"""
+    return mask
+
+
+def _rotate_180(mask):
+    """returns the 8x8 mask turned halfway around"""
+    return mirror_horizontal(flip_vertical(mask))
+
+
+def _flip_anti_diagonal(mask):
+    """returns the 8x8 mask flipped over the diagonal from the top right to the bottom left corner"""
+    return flip_diagonal(_rotate_180(mask))
+
+
+def _rotate_left(mask):
+    """returns the 8x8 mask turned a quarter counterclockwise"""
+    return flip_vertical(flip_diagonal(mask))
+
+
+def _rotate_right(mask):
+    """returns the 8x8 mask turned a quarter clockwise"""
+    return mirror_horizontal(flip_diagonal(mask))
+
+
+# the 8 symmetries of the square board. Each one is its own inverse except the two quarter turns, which undo each
+# other, so SYMMETRY_INVERSES[i] is the index of the symmetry that undoes symmetry i
+SYMMETRIES = (_identity, flip_vertical, mirror_horizontal, _rotate_180, flip_diagonal, _flip_anti_diagonal,
+              _rotate_left, _rotate_right)
+SYMMETRY_INVERSES = (0, 1, 2, 3, 4, 5, 7, 6)
+# SYMMETRY_SQUARES[i][square] is the bit index square moves to under symmetry i
+SYMMETRY_SQUARES = tuple(tuple(symmetry(1 << square).bit_length() - 1 for square in range(64))
+                         for symmetry in SYMMETRIES)
+
+
+def normalize_position(player, opponent):
+    """
+    returns (player, opponent, symmetry index) for the smallest of the 8 symmetric versions of the position, so all
+    symmetric positions share one key. A move m in the original position is SYMMETRY_SQUARES[index][m] in the
+    normalized one.
+    """
+    best = None
+    best_index = 0
+    for index, symmetry in enumerate(SYMMETRIES):
+        candidate = (symmetry(player), symmetry(opponent))
+        if best is None or candidate < best:
+            best = candidate
+            best_index = index
+    return best[0], best[1], best_index
+
+
+class BitboardGeometry:
+    """
+    Bitboard operations for a playing area of any size. Squares are numbered row by row, so padded position
+    (row, column) is bit (row - 1) * width + (column - 1). For the standard 8x8 board the fast module level functions
+    are used.
+    """
+    def __init__(self, width=8, height=8):
+        if width < 2 or height < 2:
+            raise ValueError("the playing area must be at least 2x2")
+        self._width = width
+        self._height = height
+        self._full = (1 << (width * height)) - 1
+        first_column = 0
+        for row in range(height):
+            first_column |= 1 << (row * width)
+        last_column = first_column << (width - 1)
+        self._not_first_column = self._full & ~first_column
+        self._not_last_column = self._full & ~last_column
+        self._inner_columns = self._not_first_column & self._not_last_column
+        # (shift, whether runs are limited to the inner columns). The opposite direction uses the same shift the
+        # other way.
+        self._directions = ((1, True), (width, False), (width + 1, True), (width - 1, True))
+        # (shift, mask applied after shifting) for walking a line one square at a time, positive shifts toward
+        # higher bits
+        self._steps = (
+            (1, self._not_first_column), (-1, self._not_last_column),
+            (width, self._full), (-width, self._full),
+            (width + 1, self._not_first_column), (-width - 1, self._not_last_column),
+            (width - 1, self._not_last_column), (-width + 1, self._not_first_column),
+        )
+        # the run of opponent discs is grown by doubling. With a first step of 1 and doublings of 1, 2, 4, ... it
+        # covers 1 + 1 + 2 + 4 + ... squares, which has to reach the longest possible run.
+        self._doublings = []
+        covered = 1
+        while covered < max(width, height) - 2:
+            self._doublings.append(2 ** len(self._doublings))
+            covered += self._doublings[-1]
+        # one shared (row, column) tuple per square, so positions handed out by the geometry cost no extra memory
+        self._squares = tuple((index // width + 1, index % width + 1) for index in range(width * height))
+        if width == 8 and height == 8:
+            self.legal_moves = legal_moves  # the unrolled 64-bit versions are faster
+            self.flipped_discs = flipped_discs
+
+    def get_width(self):
+        """returns the number of columns in the playing area"""
+        return self._width
+
+    def get_height(self):
+        """returns the number of rows in the playing area"""
+        return self._height
+
+    def get_full_mask(self):
+        """returns the mask with every square of the playing area set"""
+        return self._full
+
+    def square_to_bit(self, row, column):
+        """returns the bit index of a padded (row, column) position"""
+        return (row - 1) * self._width + (column - 1)
+
+    def bit_to_square(self, index):
+        """returns the padded (row, column) position of a bit index"""
+        return self._squares[index]
+
+    def get_square(self, row, column):
+        """returns the shared (row, column) tuple for a padded position"""
+        return self._squares[(row - 1) * self._width + (column - 1)]
+
+    def mask_to_squares(self, mask):
+        """returns a list of the padded (row, column) positions set in mask, in row major order"""
+        squares = self._squares
+        return [squares[index] for index in iterate_bits(mask)]
+
+    def start_position(self):
+        """returns the (black, white) masks of the four center discs at the start of a game"""
+        top = (self._height - 1) // 2
+        left = (self._width - 1) // 2
+        black = (1 << (top * self._width + left + 1)) | (1 << ((top + 1) * self._width + left))
+        white = (1 << (top * self._width + left)) | (1 << ((top + 1) * self._width + left + 1))
+        return black, white
+
+    def legal_moves(self, player, opponent):
+        """returns a mask of every empty square where player can move, see the module level legal_moves"""
+        inner = opponent & self._inner_columns
+        moves = 0
+        for shift, sideways in self._directions:
+            if sideways:
+                line = inner
+            else:
+                line = opponent
+            run = line & (player << shift)
+            pairs = line
+            for doubling in self._doublings:
+                run |= pairs & (run << shift * doubling)
+                pairs &= pairs << shift * doubling
+            moves |= run << shift
+            run = line & (player >> shift)
+            pairs = line
+            for doubling in self._doublings:
+                run |= pairs & (run >> shift * doubling)
+                pairs &= pairs >> shift * doubling
+            moves |= run >> shift
+        return moves & ~(player | opponent) & self._full
+
+    def flipped_discs(self, player, opponent, move):
+        """returns a mask of the opponent discs that flip when player moves on bit index move"""
+        flipped = 0
+        for shift, edge_mask in self._steps:
+            line = 0
+            if shift > 0:
+                square = ((1 << move) << shift) & edge_mask
+                while square & opponent:
+                    line |= square
+                    square = (square << shift) & edge_mask
+            else:
+                square = ((1 << move) >> -shift) & edge_mask
+                while square & opponent:
+                    line |= square
+                    square = (square >> -shift) & edge_mask
+            if square & player:
+                flipped |= line
+        return flipped
+
+    def play_move(self, player, opponent, move):
+        """returns the new (player, opponent) masks and the flipped mask after player moves on bit index move"""
+        flipped = self.flipped_discs(player, opponent, move)
+        return player | flipped | (1 << move), opponent ^ flipped, flipped
+
+
+_GEOMETRIES = {}  # (width, height) -> shared BitboardGeometry
+
+
+def get_geometry(width=8, height=8):
+    """returns the BitboardGeometry for a width x height playing area, made once and shared by every board that size"""
+    geometry = _GEOMETRIES.get((width, height))
+    if geometry is None:
+        geometry = _GEOMETRIES[(width, height)] = BitboardGeometry(width, height)
+    return geometry
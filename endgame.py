@@ -0,0 +1,234 @@
+# Author: Sonja Lavin
+# GitHub username: lavinso
+# Date: 10/18/26
+# Description: Perfect play endgame solver for the 8x8 board. With few empty squares left the whole game tree can be
+# searched, so EndgameSolver returns the exact final disc difference (the side to move's discs minus the
+# opponent's) with best play from both sides. Moves are ordered by mobility (the reply that leaves the opponent the
+# fewest moves first) while many squares are empty and by parity (moves in regions with an odd number of empties
+# first) near the end.
+
+import time
+
+import bitboard
+from search import CHECK_INTERVAL, SearchTimeout
+
+# the board is split into four 4x4 quadrants for parity ordering
+QUADRANTS = (
+    0x000000000F0F0F0F,  # top left
+    0x00000000F0F0F0F0,  # top right
+    0x0F0F0F0F00000000,  # bottom left
+    0xF0F0F0F000000000,  # bottom right
+)
+# corners first, then the other edge squares, then the rest. Used to break ties in the ordering.
+CORNERS = 0x8100000000000081
+EDGES = 0xFF818181818181FF
+
+
+class EndgameSolver:
+    """
+    Solves positions with at most max_empties empty squares exactly. mobility_empties is the number of empty squares
+    above which moves are sorted by the opponent's mobility, below it the cheaper parity ordering is used. Positions
+    with more than table_empties empty squares are remembered in a table of at most table_size entries. choose_move
+    stops after time_limit seconds (None for no limit) and then plays the best move found so far.
+    """
+    def __init__(self, max_empties=12, mobility_empties=7, table_empties=6, table_size=1000000, time_limit=10.0):
+        self._max_empties = max_empties
+        self._mobility_empties = mobility_empties
+        self._table_empties = table_empties
+        self._table_size = table_size
+        self._time_limit = time_limit
+        self._table = {}  # (player, opponent) -> (lower bound, upper bound) on the final disc difference
+        self._nodes = 0
+        self._next_check = 0
+        self._deadline = None
+        self._node_limit = None
+        self._best_move = None  # best root move of the current solve so far
+        self._last_result = None
+
+    def get_max_empties(self):
+        """returns the largest number of empty squares the solver is used for"""
+        return self._max_empties
+
+    def get_node_count(self):
+        """returns the number of nodes searched by the current or last solve"""
+        return self._nodes
+
+    def get_last_result(self):
+        """returns the statistics dictionary of the last solve, or None"""
+        return self._last_result
+
+    def can_solve(self, player, opponent):
+        """returns True if the position has few enough empty squares to solve"""
+        return 64 - (player | opponent).bit_count() <= self._max_empties
+
+    def choose_move(self, game, piece_color):
+        """
+        returns the padded (row, column) position with the best final result for piece_color in the Othello game, or
+        None if that color has no legal move. Raises ValueError if the board isn't 8x8 or the position has more than
+        max_empties empty squares. If the time limit runs out first the best move found so far is returned.
+        """
+        board = game.get_board()
+        if board.get_geometry().get_width() != 8 or board.get_geometry().get_height() != 8:
+            raise ValueError("the endgame solver only plays on the standard 8x8 board")
+        black_bits, white_bits = board.get_bitboards()
+        if piece_color == "black":
+            player, opponent = black_bits, white_bits
+        else:
+            player, opponent = white_bits, black_bits
+        if not self.can_solve(player, opponent):
+            raise ValueError("too many empty squares to solve, the limit is " + str(self._max_empties))
+        moves = bitboard.legal_moves(player, opponent)
+        if not moves:
+            return None
+        deadline = None
+        if self._time_limit is not None:
+            deadline = time.perf_counter() + self._time_limit
+        try:
+            move = self.solve(player, opponent, deadline)["move"]
+        except SearchTimeout:
+            move = self._best_move
+            if move is None:
+                move = self._order_moves(player, opponent, moves)[0]
+        return bitboard.bit_to_square(move)
+
+    def solve(self, player, opponent, deadline=None, node_limit=None):
+        """
+        returns a dictionary with the best move for player (bit index, None if player has to pass or the game is
+        over), the exact final disc difference with perfect play, the number of nodes searched and the time taken.
+        Raises search.SearchTimeout if the time.perf_counter() deadline passes or node_limit nodes are searched first.
+        """
+        start = time.perf_counter()
+        self._nodes = 0
+        self._next_check = CHECK_INTERVAL
+        if node_limit is not None:
+            self._next_check = min(CHECK_INTERVAL, node_limit)
+        self._deadline = deadline
+        self._node_limit = node_limit
+        self._best_move = None
+        self._table.clear()
+        best_move = None
+        moves = bitboard.legal_moves(player, opponent)
+        if moves:
+            alpha = -65
+            for move in self._order_moves(player, opponent, moves):
+                flipped = bitboard.flipped_discs(player, opponent, move)
+                new_player = opponent ^ flipped
+                new_opponent = player | flipped | (1 << move)
+                if best_move is None:
+                    score = -self._negamax(new_player, new_opponent, -64, 64)
+                else:
+                    score = -self._negamax(new_player, new_opponent, -alpha - 1, -alpha)
+                    if score > alpha:
+                        score = -self._negamax(new_player, new_opponent, -64, -score)
+                if best_move is None or score > alpha:
+                    alpha = score
+                    best_move = self._best_move = move
+            score = alpha
+        else:
+            score = self._negamax(player, opponent, -64, 64)
+        elapsed = time.perf_counter() - start
+        self._last_result = {
+            "move": best_move,
+            "score": score,
+            "nodes": self._nodes,
+            "elapsed": elapsed,
+            "nodes_per_second": self._nodes / elapsed if elapsed > 0 else 0.0,
+        }
+        return self._last_result
+
+    def _negamax(self, player, opponent, alpha, beta):
+        """
+        internal function, alpha-beta search to the end of the game on the final disc difference. The first move is
+        searched with the full window and the rest with a null window that only proves they are no better, searching
+        again if one is. Results with many empties are kept as (lower, upper) bounds in the table.
+        """
+        self._nodes += 1
+        if self._nodes >= self._next_check:
+            self._check_budget()
+        moves = bitboard.legal_moves(player, opponent)
+        if not moves:
+            if not bitboard.legal_moves(opponent, player):
+                return player.bit_count() - opponent.bit_count()
+            return -self._negamax(opponent, player, -beta, -alpha)
+
+        if moves & (moves - 1) == 0:  # a single move needs no ordering
+            move = moves.bit_length() - 1
+            flipped = bitboard.flipped_discs(player, opponent, move)
+            return -self._negamax(opponent ^ flipped, player | flipped | moves, -beta, -alpha)
+
+        use_table = 64 - (player | opponent).bit_count() > self._table_empties
+        if use_table:
+            key = (player, opponent)
+            bounds = self._table.get(key)
+            if bounds is not None:
+                if bounds[0] >= beta:
+                    return bounds[0]
+                if bounds[1] <= alpha:
+                    return bounds[1]
+                if bounds[0] == bounds[1]:
+                    return bounds[0]
+                alpha = max(alpha, bounds[0])
+                beta = min(beta, bounds[1])
+        original_alpha = alpha
+
+        best_score = -65
+        for move in self._order_moves(player, opponent, moves):
+            flipped = bitboard.flipped_discs(player, opponent, move)
+            new_player = opponent ^ flipped
+            new_opponent = player | flipped | (1 << move)
+            if best_score == -65:
+                score = -self._negamax(new_player, new_opponent, -beta, -alpha)
+            else:
+                score = -self._negamax(new_player, new_opponent, -alpha - 1, -alpha)
+                if alpha < score < beta:
+                    score = -self._negamax(new_player, new_opponent, -beta, -score)
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if use_table:
+            if len(self._table) >= self._table_size:
+                self._table.clear()  # simplest way to bound the memory, the table refills quickly
+            lower, upper = self._table.get(key, (-64, 64))
+            if best_score <= original_alpha:
+                upper = min(upper, best_score)
+            elif best_score >= beta:
+                lower = max(lower, best_score)
+            else:
+                lower = best_score
+                upper = best_score
+            self._table[key] = (lower, upper)
+        return best_score
+
+    def _check_budget(self):
+        """internal function that raises SearchTimeout when the time or node budget of the solve is used up"""
+        if self._node_limit is not None and self._nodes >= self._node_limit:
+            raise SearchTimeout()
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise SearchTimeout()
+        self._next_check = self._nodes + CHECK_INTERVAL
+        if self._node_limit is not None:
+            self._next_check = min(self._next_check, self._node_limit)
+
+    def _order_moves(self, player, opponent, moves):
+        """internal function that returns the moves in the mask in the order they should be searched"""
+        empty = ~(player | opponent) & bitboard.FULL_BOARD
+        if empty.bit_count() > self._mobility_empties:
+            # fastest first: the move that leaves the opponent the fewest replies, corners breaking ties
+            scored = []
+            for move in bitboard.iterate_bits(moves):
+                flipped = bitboard.flipped_discs(player, opponent, move)
+                replies = bitboard.legal_moves(opponent ^ flipped, player | flipped | (1 << move)).bit_count()
+                scored.append((replies * 4 - ((1 << move) & CORNERS != 0) * 2 - ((1 << move) & EDGES != 0), move))
+            scored.sort()
+            return [move for _, move in scored]
+        # parity: moves in quadrants with an odd number of empty squares first
+        odd_quadrants = 0
+        for quadrant in QUADRANTS:
+            if (empty & quadrant).bit_count() & 1:
+                odd_quadrants |= quadrant
+        first = moves & odd_quadrants
+        return list(bitboard.iterate_bits(first)) + list(bitboard.iterate_bits(moves ^ first))
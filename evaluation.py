@@ -0,0 +1,423 @@
+# Author: Sonja Lavin
+# GitHub username: lavinso
+# Date: 10/18/26
+# Description: Static evaluation for the 8x8 board. The score of a position is a prediction of the final disc
+# difference for the side to move, the sum of a few weighted features (mobility, frontier discs, corners, X-squares
+# next to empty corners and stable edge discs) and the weights of pattern tables indexed by the configuration of each
+# edge, corner and diagonal. Pattern configurations are turned into table indexes with precomputed base 3 tables, so
+# evaluating is lookups instead of walking squares. Weights can be fitted from game record archives, see
+# "python evaluation.py --help".
+
+import argparse
+import json
+import random
+import struct
+import sys
+from array import array
+
+import batch
+import bitboard
+
+EVALUATION_HEADER = b"OTHE\x01"
+
+# the four quarter turns of the board. Each pattern is read from one place on the turned board, so one table covers
+# all four of its copies
+ROTATIONS = (bitboard.SYMMETRIES[0], bitboard.SYMMETRIES[6], bitboard.SYMMETRIES[3], bitboard.SYMMETRIES[7])
+
+SCALAR_FEATURES = ("mobility", "frontier", "corners", "x_squares", "stable_edges")
+DEFAULT_SCALAR_WEIGHTS = (1.0, -0.5, 3.0, -2.0, 1.0)  # used until weights are fitted
+
+# (name, squares in the pattern, copies on the board). The edge is the 8 edge squares and the two X-squares next to
+# its corners, the corner is the 3x3 block in the corner, and the diagonals are the long diagonals and the ones next
+# to them.
+PATTERNS = (("edge", 10, 4), ("corner", 9, 4), ("diagonal", 8, 2), ("diagonal_7", 7, 4))
+EDGE_OFFSET = len(SCALAR_FEATURES)  # where each table starts in a stage's weights, after the scalar weights
+CORNER_OFFSET = EDGE_OFFSET + 3 ** 10
+DIAGONAL_OFFSET = CORNER_OFFSET + 3 ** 9
+DIAGONAL_7_OFFSET = DIAGONAL_OFFSET + 3 ** 8
+STAGE_SIZE = DIAGONAL_7_OFFSET + 3 ** 7
+
+CORNERS = 0x8100000000000081
+
+# TERNARY[bits] is bits read as a base 3 number, so a pattern's index is TERNARY[player bits] + 2 * TERNARY[opponent
+# bits], with digit 0 for empty, 1 for the player and 2 for the opponent
+TERNARY = tuple(sum(3 ** digit for digit in range(10) if bits >> digit & 1) for bits in range(1 << 10))
+
+
+def _digits(index, length):
+    """internal function that returns the base 3 digits of a pattern index, first square first"""
+    digits = []
+    for _ in range(length):
+        digits.append(index % 3)
+        index //= 3
+    return digits
+
+
+def _stable_edge_difference(digits):
+    """
+    internal function that returns the player's stable discs minus the opponent's on one edge. A full edge can't
+    change, otherwise the discs in an unbroken run of one color from a corner can't be flipped along the edge.
+    """
+    if 0 not in digits:
+        stable = digits
+    else:
+        stable = []
+        for line in (digits, digits[::-1]):
+            for digit in line:
+                if digit == 0 or digit != line[0]:
+                    break
+                stable.append(digit)
+    return stable.count(1) - stable.count(2)
+
+
+# player minus opponent stable discs for every configuration of the 8 squares of an edge
+STABLE_EDGES = tuple(_stable_edge_difference(_digits(index, 8)) for index in range(3 ** 8))
+
+
+def position_features(player, opponent):
+    """
+    returns (pattern indexes, scalar features) for the position with player to move. The pattern indexes are offsets
+    into one stage's weights, one for every copy of every pattern, and the scalar features are the player minus the
+    opponent for each of SCALAR_FEATURES.
+    """
+    indexes = []
+    stable = 0
+    for rotation, rotate in enumerate(ROTATIONS):
+        turned_player = rotate(player)
+        turned_opponent = rotate(opponent)
+        edge_player = turned_player & 0xFF
+        edge_opponent = turned_opponent & 0xFF
+        stable += STABLE_EDGES[TERNARY[edge_player] + 2 * TERNARY[edge_opponent]]
+        indexes.append(EDGE_OFFSET
+                       + TERNARY[edge_player | (turned_player >> 1 & 0x100) | (turned_player >> 5 & 0x200)]
+                       + 2 * TERNARY[edge_opponent | (turned_opponent >> 1 & 0x100) | (turned_opponent >> 5 & 0x200)])
+        indexes.append(CORNER_OFFSET
+                       + TERNARY[(turned_player & 7) | (turned_player >> 5 & 0x38) | (turned_player >> 10 & 0x1C0)]
+                       + 2 * TERNARY[(turned_opponent & 7) | (turned_opponent >> 5 & 0x38)
+                                     | (turned_opponent >> 10 & 0x1C0)])
+        # multiplying gathers the diagonal squares into the top row without any carries
+        indexes.append(DIAGONAL_7_OFFSET
+                       + TERNARY[((turned_player & 0x0080402010080402) * 0x0101010101010101) >> 57 & 0x7F]
+                       + 2 * TERNARY[((turned_opponent & 0x0080402010080402) * 0x0101010101010101) >> 57 & 0x7F])
+        if rotation < 2:  # a half turn reads the long diagonals backwards, two copies cover both of them
+            indexes.append(DIAGONAL_OFFSET
+                           + TERNARY[((turned_player & 0x8040201008040201) * 0x0101010101010101) >> 56 & 0xFF]
+                           + 2 * TERNARY[((turned_opponent & 0x8040201008040201) * 0x0101010101010101) >> 56 & 0xFF])
+
+    empty = ~(player | opponent) & bitboard.FULL_BOARD
+    # squares next to an empty square, the discs there are the frontier
+    next_to_empty = (((empty << 1) & bitboard.NOT_A_FILE) | ((empty >> 1) & bitboard.NOT_H_FILE) | (empty << 8)
+                     | (empty >> 8) | ((empty << 9) & bitboard.NOT_A_FILE) | ((empty >> 9) & bitboard.NOT_H_FILE)
+                     | ((empty << 7) & bitboard.NOT_H_FILE) | ((empty >> 7) & bitboard.NOT_A_FILE))
+    empty_corners = empty & CORNERS
+    x_squares = (((empty_corners & 1) << 9) | ((empty_corners & 0x80) << 7) | ((empty_corners >> 7) & (1 << 49))
+                 | ((empty_corners >> 9) & (1 << 54)))
+    scalars = (
+        bitboard.legal_moves(player, opponent).bit_count() - bitboard.legal_moves(opponent, player).bit_count(),
+        (player & next_to_empty).bit_count() - (opponent & next_to_empty).bit_count(),
+        (player & CORNERS).bit_count() - (opponent & CORNERS).bit_count(),
+        (player & x_squares).bit_count() - (opponent & x_squares).bit_count(),
+        stable,
+    )
+    return indexes, scalars
+
+
+def _mirror_table():
+    """
+    internal function that returns, for every offset in a stage's weights, the offset of the same pattern seen in a
+    mirror. Fitting keeps the two weights equal, so a configuration and its mirror image learn together.
+    """
+    # digit i of the mirrored configuration is digit permutation[i] of the original
+    permutations = (
+        (EDGE_OFFSET, [7, 6, 5, 4, 3, 2, 1, 0, 9, 8]),
+        (CORNER_OFFSET, [3 * (digit % 3) + digit // 3 for digit in range(9)]),  # turned over its diagonal
+        (DIAGONAL_OFFSET, list(range(7, -1, -1))),
+        (DIAGONAL_7_OFFSET, list(range(6, -1, -1))),
+    )
+    mirrors = array("I", range(STAGE_SIZE))
+    for offset, permutation in permutations:
+        length = len(permutation)
+        for index in range(3 ** length):
+            digits = _digits(index, length)
+            mirrors[offset + index] = offset + sum(digits[permutation[digit]] * 3 ** digit for digit in range(length))
+    return mirrors
+
+
+def load_positions(paths):
+    """
+    replays every game in the game record archives at paths and returns (players, opponents, results) arrays with
+    one entry for every position where a move was played: the side to move's and the other side's masks, and the
+    final disc difference for the side to move
+    """
+    from game_record import GameRecordReader  # only needed when fitting
+    players = array("Q")
+    opponents = array("Q")
+    results = array("b")
+    for path in paths:
+        with GameRecordReader(path) as reader:
+            if reader.get_board_size() != 8:
+                raise ValueError(path + " doesn't hold 8x8 games")
+            for moves in reader:
+                player, opponent = bitboard.BLACK_START, bitboard.WHITE_START
+                black_to_move = True
+                black_moved = []
+                for move in moves:
+                    if not bitboard.legal_moves(player, opponent):  # the side to move passes
+                        player, opponent = opponent, player
+                        black_to_move = not black_to_move
+                    players.append(player)
+                    opponents.append(opponent)
+                    black_moved.append(black_to_move)
+                    player, opponent, flipped = bitboard.play_move(player, opponent, move)
+                    player, opponent = opponent, player
+                    black_to_move = not black_to_move
+                if black_to_move:
+                    black_difference = player.bit_count() - opponent.bit_count()
+                else:
+                    black_difference = opponent.bit_count() - player.bit_count()
+                for index in range(len(black_moved)):
+                    results.append(black_difference if black_moved[index] else -black_difference)
+    return players, opponents, results
+
+
+class Evaluator:
+    """
+    Pattern and feature evaluation. The game is split into number_stages stages by the number of discs on the board,
+    each with its own weights. An Evaluator can be called like a function, evaluator(player, opponent), so it can be
+    passed to SearchEngine(evaluator=...).
+    """
+    def __init__(self, number_stages=4):
+        self._number_stages = number_stages
+        self._weights = []  # one array of STAGE_SIZE doubles per stage: the scalar weights, then the pattern tables
+        for _ in range(number_stages):
+            weights = array("d", DEFAULT_SCALAR_WEIGHTS)
+            weights.extend(array("d", bytes(8 * (STAGE_SIZE - len(DEFAULT_SCALAR_WEIGHTS)))))
+            self._weights.append(weights)
+        self._batch_weights = None  # numpy copy of the weights for evaluate_batch, made on first use
+
+    def get_number_stages(self):
+        """returns the number of game stages"""
+        return self._number_stages
+
+    def get_weights(self, stage):
+        """returns the array of weights for a stage. Call weights_changed after changing it"""
+        return self._weights[stage]
+
+    def weights_changed(self):
+        """drops the copy of the weights used by evaluate_batch so it is made again"""
+        self._batch_weights = None
+
+    def get_stage(self, player, opponent):
+        """returns the stage of a position, from 0 at the start of the game to number_stages - 1 at the end"""
+        return min(self._number_stages - 1, ((player | opponent).bit_count() - 4) * self._number_stages // 61)
+
+    def evaluate(self, player, opponent):
+        """returns the predicted final disc difference for player, the side to move"""
+        weights = self._weights[self.get_stage(player, opponent)]
+        indexes, scalars = position_features(player, opponent)
+        score = 0.0
+        for index in indexes:
+            score += weights[index]
+        for feature, value in enumerate(scalars):
+            score += weights[feature] * value
+        return score
+
+    def __call__(self, player, opponent):
+        """same as evaluate, so the evaluator can be used as a SearchEngine evaluation function"""
+        return self.evaluate(player, opponent)
+
+    def evaluate_batch(self, players, opponents):
+        """
+        evaluates many positions at once. With numpy installed players and opponents can be lists or uint64 arrays and
+        a float array is returned; without it a list of scores is returned.
+        """
+        if batch.numpy is None:
+            return [self.evaluate(player, opponent) for player, opponent in zip(players, opponents)]
+        numpy = batch.numpy
+        players = numpy.asarray(players, dtype=numpy.uint64)
+        opponents = numpy.asarray(opponents, dtype=numpy.uint64)
+        if self._batch_weights is None:
+            self._batch_weights = numpy.concatenate([numpy.frombuffer(weights, dtype=numpy.float64)
+                                                     for weights in self._weights])
+        indexes, scalars = _batch_features(players, opponents)
+        discs = batch.count_bits(players | opponents)
+        stages = numpy.minimum(self._number_stages - 1, (discs - 4) * self._number_stages // 61)
+        stage_offsets = (stages * STAGE_SIZE)[:, None]
+        score = self._batch_weights[stage_offsets + indexes].sum(axis=1)
+        scalar_weights = self._batch_weights[stage_offsets + numpy.arange(len(SCALAR_FEATURES))]
+        return score + (scalar_weights * scalars).sum(axis=1)
+
+    def fit(self, players, opponents, results, epochs=3, learning_rate=0.5, seed=0, report=None):
+        """
+        fits the weights to the positions and final results from load_positions with normalized least mean squares:
+        after each position every weight it used moves toward the result, by a step scaled so the prediction can't
+        overshoot. Positions are visited in a shuffled order each epoch. report, if given, is called after every
+        epoch with the epoch number and the mean absolute error over that epoch.
+        """
+        mirrors = _mirror_table()
+        order = list(range(len(results)))
+        generator = random.Random(seed)
+        for epoch in range(epochs):
+            generator.shuffle(order)
+            total_error = 0.0
+            for sample in order:
+                player = players[sample]
+                opponent = opponents[sample]
+                weights = self._weights[self.get_stage(player, opponent)]
+                indexes, scalars = position_features(player, opponent)
+                prediction = 0.0
+                for index in indexes:
+                    prediction += weights[index]
+                for feature, value in enumerate(scalars):
+                    prediction += weights[feature] * value
+                error = results[sample] - prediction
+                total_error += abs(error)
+                step = learning_rate * error / (len(indexes) + sum(value * value for value in scalars))
+                for index in indexes:
+                    weights[index] += step
+                    weights[mirrors[index]] = weights[index]
+                for feature, value in enumerate(scalars):
+                    weights[feature] += step * value
+            if report is not None:
+                report(epoch + 1, total_error / max(len(order), 1))
+        self.weights_changed()
+
+    def save(self, path):
+        """writes the weights to a file"""
+        with open(path, "wb") as weights_file:
+            weights_file.write(EVALUATION_HEADER + struct.pack(">BI", self._number_stages, STAGE_SIZE))
+            for weights in self._weights:
+                weights = array("d", weights)
+                if sys.byteorder == "big":
+                    weights.byteswap()  # stored little endian
+                weights.tofile(weights_file)
+
+    @classmethod
+    def load(cls, path):
+        """returns an Evaluator with the weights saved in a file"""
+        with open(path, "rb") as weights_file:
+            header = weights_file.read(len(EVALUATION_HEADER) + 5)
+            if header[:len(EVALUATION_HEADER)] != EVALUATION_HEADER:
+                raise ValueError(path + " is not an evaluation weights file")
+            number_stages, stage_size = struct.unpack(">BI", header[len(EVALUATION_HEADER):])
+            if stage_size != STAGE_SIZE:
+                raise ValueError(path + " was saved with different patterns")
+            evaluator = cls(number_stages)
+            for stage in range(number_stages):
+                weights = array("d")
+                weights.fromfile(weights_file, STAGE_SIZE)
+                if sys.byteorder == "big":
+                    weights.byteswap()
+                evaluator._weights[stage] = weights
+        return evaluator
+
+
+def _batch_mirror(masks):
+    """internal function, numpy version of bitboard.mirror_horizontal"""
+    numpy = batch.numpy
+    for shift, mask in ((1, 0x5555555555555555), (2, 0x3333333333333333), (4, 0x0F0F0F0F0F0F0F0F)):
+        shift = numpy.uint64(shift)
+        mask = numpy.uint64(mask)
+        masks = ((masks >> shift) & mask) | ((masks & mask) << shift)
+    return masks
+
+
+def _batch_flip_diagonal(masks):
+    """internal function, numpy version of bitboard.flip_diagonal"""
+    numpy = batch.numpy
+    for shift, mask in ((28, 0x0F0F0F0F00000000), (14, 0x3333000033330000), (7, 0x5500550055005500)):
+        shift = numpy.uint64(shift)
+        swap = numpy.uint64(mask) & (masks ^ (masks << shift))
+        masks = masks ^ swap ^ (swap >> shift)
+    return masks
+
+
+def _batch_features(players, opponents):
+    """
+    internal function, numpy version of position_features for uint64 arrays. Returns an N x 14 array of pattern
+    indexes and an N x 5 array of scalar features.
+    """
+    numpy = batch.numpy
+    ternary = numpy.array(TERNARY, dtype=numpy.int64)
+    stable_edges = numpy.array(STABLE_EDGES, dtype=numpy.int64)
+    spread = numpy.uint64(0x0101010101010101)
+
+    def read(player_bits, opponent_bits):
+        return ternary[player_bits.astype(numpy.int64)] + 2 * ternary[opponent_bits.astype(numpy.int64)]
+
+    def value(masks, shift, mask):
+        return (masks >> numpy.uint64(shift)) & numpy.uint64(mask)
+
+    def turned(masks):
+        flipped = _batch_flip_diagonal(masks)
+        return (masks, flipped.byteswap(), _batch_mirror(masks.byteswap()), _batch_mirror(flipped))
+
+    indexes = []
+    stable = numpy.zeros(len(players), dtype=numpy.int64)
+    for rotation, (player, opponent) in enumerate(zip(turned(players), turned(opponents))):
+        edge_player = value(player, 0, 0xFF)
+        edge_opponent = value(opponent, 0, 0xFF)
+        stable += stable_edges[read(edge_player, edge_opponent)]
+        indexes.append(EDGE_OFFSET + read(edge_player | value(player, 1, 0x100) | value(player, 5, 0x200),
+                                          edge_opponent | value(opponent, 1, 0x100) | value(opponent, 5, 0x200)))
+        indexes.append(CORNER_OFFSET + read(value(player, 0, 7) | value(player, 5, 0x38) | value(player, 10, 0x1C0),
+                                            value(opponent, 0, 7) | value(opponent, 5, 0x38)
+                                            | value(opponent, 10, 0x1C0)))
+        diagonal_7 = numpy.uint64(0x0080402010080402)
+        indexes.append(DIAGONAL_7_OFFSET + read(value((player & diagonal_7) * spread, 57, 0x7F),
+                                                value((opponent & diagonal_7) * spread, 57, 0x7F)))
+        if rotation < 2:
+            diagonal = numpy.uint64(0x8040201008040201)
+            indexes.append(DIAGONAL_OFFSET + read(value((player & diagonal) * spread, 56, 0xFF),
+                                                  value((opponent & diagonal) * spread, 56, 0xFF)))
+
+    empty = ~(players | opponents)
+    one = numpy.uint64(1)
+    seven = numpy.uint64(7)
+    eight = numpy.uint64(8)
+    nine = numpy.uint64(9)
+    not_a_file = numpy.uint64(bitboard.NOT_A_FILE)
+    not_h_file = numpy.uint64(bitboard.NOT_H_FILE)
+    next_to_empty = (((empty << one) & not_a_file) | ((empty >> one) & not_h_file) | (empty << eight)
+                     | (empty >> eight) | ((empty << nine) & not_a_file) | ((empty >> nine) & not_h_file)
+                     | ((empty << seven) & not_h_file) | ((empty >> seven) & not_a_file))
+    empty_corners = empty & numpy.uint64(CORNERS)
+    x_squares = (((empty_corners & one) << nine) | ((empty_corners & numpy.uint64(0x80)) << seven)
+                 | ((empty_corners >> seven) & numpy.uint64(1 << 49))
+                 | ((empty_corners >> nine) & numpy.uint64(1 << 54)))
+    corners = numpy.uint64(CORNERS)
+    count = batch.count_bits
+    scalars = numpy.stack([
+        count(batch.legal_moves(players, opponents)) - count(batch.legal_moves(opponents, players)),
+        count(players & next_to_empty) - count(opponents & next_to_empty),
+        count(players & corners) - count(opponents & corners),
+        count(players & x_squares) - count(opponents & x_squares),
+        stable,
+    ], axis=1)
+    return numpy.stack(indexes, axis=1), scalars
+
+
+def main(arguments=None):
+    """command line entry point. Fits weights to game record archives and writes them to --output"""
+    parser = argparse.ArgumentParser(description="Fit evaluation weights to recorded games")
+    parser.add_argument("archives", nargs="+", help="game record archive files (see game_record.py)")
+    parser.add_argument("--output", default="weights.bin", help="file to write the weights to")
+    parser.add_argument("--stages", type=int, default=4, help="number of game stages with their own weights")
+    parser.add_argument("--epochs", type=int, default=3, help="passes over the positions")
+    parser.add_argument("--rate", type=float, default=0.5, help="learning rate, between 0 and 1")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the order positions are visited in")
+    options = parser.parse_args(arguments)
+
+    players, opponents, results = load_positions(options.archives)
+    evaluator = Evaluator(options.stages)
+
+    def report(epoch, error):
+        print(json.dumps({"epoch": epoch, "positions": len(results), "mean_absolute_error": error}))
+        sys.stdout.flush()
+
+    evaluator.fit(players, opponents, results, options.epochs, options.rate, options.seed, report)
+    evaluator.save(options.output)
+
+
+if __name__ == "__main__":
+    main()
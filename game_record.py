@@ -0,0 +1,229 @@
+# Author: Sonja Lavin
+# GitHub username: lavinso
+# Date: 10/18/26
+# Description: Compact binary formats for archiving Othello games.
+# A position is 16 bytes: the black mask then the white mask, each a big endian 64-bit number in the bitboard.py
+# layout. A game is stored as its moves, one byte per move (the bit index of the square). Passes aren't stored, when
+# the side to move has no legal move it passes, so replaying the moves from the start position gives back the game.
+# An archive file starts with a header followed by records of a 1 byte move count and the moves. The header is
+# b"OTHR\x01" for 8x8 games, or b"OTHR\x02" and a byte with the board size for the other sizes. Files are only ever
+# appended to, and GameRecordReader memory maps them so any game can be read by its index.
+
+import mmap
+import os
+import struct
+from array import array
+
+import bitboard
+from Othello import TOKENS, Board, Othello
+
+FILE_HEADER = b"OTHR\x01"
+SIZED_FILE_HEADER = b"OTHR\x02"  # followed by one byte with the board size
+POSITION_FORMAT = ">QQ"
+POSITION_SIZE = 16
+
+
+def encode_position(board):
+    """returns the 16 byte encoding of a Board's playing area. Only the standard 8x8 board fits in 16 bytes"""
+    if board.get_geometry().get_width() != 8 or board.get_geometry().get_height() != 8:
+        raise ValueError("only 8x8 positions can be encoded in 16 bytes")
+    black_bits, white_bits = board.get_bitboards()
+    return struct.pack(POSITION_FORMAT, black_bits, white_bits)
+
+
+def decode_position(data, backend="list"):
+    """returns a new Board holding the position in a 16 byte encoding"""
+    black_bits, white_bits = struct.unpack(POSITION_FORMAT, data)
+    if black_bits & white_bits:
+        raise ValueError("invalid position, a square is both black and white")
+    board = Board(backend=backend)
+    for index in bitboard.iterate_bits(black_bits):
+        board.add_change_tokens(bitboard.bit_to_square(index), "X")
+    for index in bitboard.iterate_bits(white_bits):
+        board.add_change_tokens(bitboard.bit_to_square(index), "O")
+    return board
+
+
+def encode_moves(game):
+    """returns the moves in an Othello game's move history, one byte per move. Works for boards up to 16x16"""
+    geometry = game.get_board().get_geometry()
+    if geometry.get_width() * geometry.get_height() > 256:
+        raise ValueError("a move only fits in one byte on boards with at most 256 squares")
+    return bytes(geometry.square_to_bit(*record.position) for record in game.get_move_history())
+
+
+def decode_moves(data, backend="bitboard", black_name="black", white_name="white", board_size=8):
+    """
+    replays a one byte per move record from the start position and returns the Othello game. Raises ValueError if a
+    move isn't legal for the side to move.
+    """
+    game = Othello(backend=backend, board_size=board_size)
+    game.create_player(black_name, "black")
+    game.create_player(white_name, "white")
+    board = game.get_board()
+    geometry = board.get_geometry()
+    piece_color = "black"
+    for move in data:
+        if not board.has_legal_move(TOKENS[piece_color]):  # the side to move passes
+            piece_color = "white" if piece_color == "black" else "black"
+        if move >= board_size * board_size:
+            raise ValueError("move " + str(move) + " is off the " + str(board_size) + "x" + str(board_size) + " board")
+        piece_position = geometry.bit_to_square(move)
+        if piece_position not in board.get_legal_moves(TOKENS[piece_color]):
+            raise ValueError("move " + str(move) + " is not legal for " + piece_color)
+        game.apply_move(piece_color, piece_position)
+        piece_color = "white" if piece_color == "black" else "black"
+    return game
+
+
+def file_header(board_size):
+    """returns the archive file header for games on a board_size x board_size board"""
+    if board_size == 8:
+        return FILE_HEADER
+    if not 4 <= board_size <= 16:
+        raise ValueError("game records hold boards from 4x4 to 16x16")
+    return SIZED_FILE_HEADER + bytes((board_size,))
+
+
+def read_file_header(data):
+    """returns (board size, header length) for the start of an archive file, or None if it isn't a game record file"""
+    if data[:len(FILE_HEADER)] == FILE_HEADER:
+        return 8, len(FILE_HEADER)
+    if data[:len(SIZED_FILE_HEADER)] == SIZED_FILE_HEADER and len(data) > len(SIZED_FILE_HEADER):
+        return data[len(SIZED_FILE_HEADER)], len(SIZED_FILE_HEADER) + 1
+    return None
+
+
+def _record_offsets(data, offset):
+    """
+    internal function that yields the offset of every complete record in an archive's data, starting from the first
+    record at offset. A partly written last record is left out
+    """
+    size = len(data)
+    while offset < size:
+        end = offset + 1 + data[offset]
+        if end > size:
+            break
+        yield offset
+        offset = end
+
+
+class GameRecordWriter:
+    """
+    Appends game records to an archive file, creating it (with its header) if needed. Every game in a file is played
+    on a board_size x board_size board, which is stored in the header. A partly written last record (left by a writer
+    that was stopped) is cut off before appending. Can be used as a context manager.
+    """
+    def __init__(self, path, board_size=8):
+        self._file = open(path, "a+b")
+        self._board_size = board_size
+        if self._file.tell() == 0:
+            self._file.write(file_header(board_size))
+        else:
+            self._file.seek(0)
+            header = read_file_header(self._file.read(len(SIZED_FILE_HEADER) + 1))
+            if header is None or header[0] != board_size:
+                self._file.close()
+                raise ValueError(path + " is not a game record file for " + str(board_size) + "x" + str(board_size)
+                                 + " games")
+            self._truncate_partial_record(header[1])
+
+    def get_board_size(self):
+        """returns the board size of the games in the file"""
+        return self._board_size
+
+    def _truncate_partial_record(self, header_length):
+        """internal function that cuts a partly written last record off the end of the file"""
+        end = header_length
+        if os.fstat(self._file.fileno()).st_size > header_length:
+            with mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for offset in _record_offsets(data, header_length):
+                    end = offset + 1 + data[offset]
+                size = len(data)
+        else:
+            size = end
+        if end < size:
+            self._file.truncate(end)
+
+    def write_game(self, game):
+        """appends an Othello game's moves. Raises ValueError if it wasn't played on the file's board size"""
+        geometry = game.get_board().get_geometry()
+        if geometry.get_width() != self._board_size or geometry.get_height() != self._board_size:
+            raise ValueError("the file holds " + str(self._board_size) + "x" + str(self._board_size) + " games")
+        self.write_moves(encode_moves(game))
+
+    def write_moves(self, moves):
+        """appends a one byte per move record (bytes or a list of bit indexes)"""
+        moves = bytes(moves)
+        if len(moves) > 255:
+            raise ValueError("a game record can hold at most 255 moves")
+        self._file.write(bytes((len(moves),)) + moves)
+
+    def flush(self):
+        """writes buffered records to the file"""
+        self._file.flush()
+
+    def close(self):
+        """closes the file"""
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class GameRecordReader:
+    """
+    Reads an archive file through a read only memory map. Opening the file only walks the record lengths to build an
+    index of where each game starts, so reader[index] returns any game's moves without reading the others and
+    iterating streams through the file. Can be used as a context manager.
+    """
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._offsets = array("Q")
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._map = b""  # mmap can't map an empty file
+        else:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        header = read_file_header(self._map[:len(SIZED_FILE_HEADER) + 1])
+        if header is None:
+            self.close()
+            raise ValueError(path + " is not a game record file")
+        self._board_size, offset = header
+        self._offsets.extend(_record_offsets(self._map, offset))
+
+    def get_board_size(self):
+        """returns the board size of the games in the file"""
+        return self._board_size
+
+    def __len__(self):
+        """returns the number of games in the file"""
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        """returns the moves of game number index as bytes"""
+        offset = self._offsets[index]
+        return self._map[offset + 1:offset + 1 + self._map[offset]]
+
+    def __iter__(self):
+        """yields the moves of every game in file order"""
+        for index in range(len(self._offsets)):
+            yield self[index]
+
+    def get_game(self, index, backend="bitboard"):
+        """returns game number index replayed as an Othello game"""
+        return decode_moves(self[index], backend, board_size=self._board_size)
+
+    def close(self):
+        """closes the memory map and the file"""
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
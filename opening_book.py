@@ -0,0 +1,152 @@
+# Author: Sonja Lavin
+# GitHub username: lavinso
+# Date: 10/18/26
+# Description: Opening book for the 8x8 board, built from recorded games. Each position is stored once for all 8
+# symmetric versions of it, keyed by its normalized (player to move, opponent) masks, with the number of games that
+# played each move from it and their total final disc difference. A saved book is only read from disk the first time
+# it is used.
+
+import os
+import struct
+
+import bitboard
+
+BOOK_HEADER = b"OTHB\x01"
+ENTRY_FORMAT = ">QQBIi"  # player, opponent, move, games, total disc difference for the player to move
+
+
+def normalize_move(player, opponent, move):
+    """
+    returns (normalized player, normalized opponent, normalized move, symmetry index). Positions that look the same
+    under some of the symmetries (like the start position) can map a move to the key in more than one way, so the
+    smallest normalized square is used and equivalent moves share one entry.
+    """
+    key_player, key_opponent, symmetry = bitboard.normalize_position(player, opponent)
+    normalized = bitboard.SYMMETRY_SQUARES[symmetry][move]
+    for index, other in enumerate(bitboard.SYMMETRIES):
+        if index != symmetry and other(player) == key_player and other(opponent) == key_opponent:
+            normalized = min(normalized, bitboard.SYMMETRY_SQUARES[index][move])
+    return key_player, key_opponent, normalized, symmetry
+
+
+class OpeningBook:
+    """
+    Position keyed opening book. Games are added as one byte per move records (see game_record.py) and only their
+    first max_plies moves are stored. A book move needs at least min_games games behind it, and the move with the best
+    average result is played. If path is given the book is loaded from that file the first time it is used.
+    """
+    def __init__(self, path=None, max_plies=12, min_games=1):
+        self._path = path
+        self._max_plies = max_plies
+        self._min_games = min_games
+        self._entries = None  # normalized (player, opponent) -> {normalized move: [games, total score]}, lazy
+
+    def _get_entries(self):
+        """internal function that returns the entries, loading the book file the first time"""
+        if self._entries is None:
+            self._entries = {}
+            if self._path is not None and os.path.exists(self._path):
+                self._load(self._path)
+        return self._entries
+
+    def _load(self, path):
+        """internal function that reads a saved book into the entries"""
+        with open(path, "rb") as book_file:
+            if book_file.read(len(BOOK_HEADER)) != BOOK_HEADER:
+                raise ValueError(path + " is not an opening book file")
+            data = book_file.read()
+        for player, opponent, move, games, total in struct.iter_unpack(ENTRY_FORMAT, data):
+            self._entries.setdefault((player, opponent), {})[move] = [games, total]
+
+    def save(self, path=None):
+        """writes the book to path (by default the path it was loaded from)"""
+        if path is None:
+            path = self._path
+        with open(path, "wb") as book_file:
+            book_file.write(BOOK_HEADER)
+            for (player, opponent), moves in self._get_entries().items():
+                for move, (games, total) in moves.items():
+                    book_file.write(struct.pack(ENTRY_FORMAT, player, opponent, move, games, total))
+
+    def __len__(self):
+        """returns the number of positions in the book"""
+        return len(self._get_entries())
+
+    def add_game(self, moves):
+        """
+        adds a game given as a sequence of move bit indexes from the start position. The game is replayed to the end
+        to find its result. Raises ValueError if a move is illegal.
+        """
+        player, opponent = bitboard.BLACK_START, bitboard.WHITE_START
+        black_to_move = True
+        book_moves = []  # (player, opponent, move, black to move) for the stored plies
+        for move in moves:
+            if not bitboard.legal_moves(player, opponent):  # the side to move passes
+                player, opponent = opponent, player
+                black_to_move = not black_to_move
+            if not (1 << move) & bitboard.legal_moves(player, opponent):
+                raise ValueError("move " + str(move) + " is not legal")
+            if len(book_moves) < self._max_plies:
+                book_moves.append((player, opponent, move, black_to_move))
+            player, opponent, flipped = bitboard.play_move(player, opponent, move)
+            player, opponent = opponent, player
+            black_to_move = not black_to_move
+        if black_to_move:
+            black_difference = player.bit_count() - opponent.bit_count()
+        else:
+            black_difference = opponent.bit_count() - player.bit_count()
+
+        entries = self._get_entries()
+        for player, opponent, move, black_moved in book_moves:
+            key_player, key_opponent, normalized, symmetry = normalize_move(player, opponent, move)
+            move_stats = entries.setdefault((key_player, key_opponent), {}).setdefault(normalized, [0, 0])
+            move_stats[0] += 1
+            move_stats[1] += black_difference if black_moved else -black_difference
+
+    def build_from_archive(self, path):
+        """adds every game in a game record archive file of 8x8 games"""
+        from game_record import GameRecordReader  # only needed when building a book
+        with GameRecordReader(path) as reader:
+            if reader.get_board_size() != 8:
+                raise ValueError(path + " doesn't hold 8x8 games")
+            for moves in reader:
+                self.add_game(moves)
+
+    def get_book_moves(self, player, opponent):
+        """
+        returns a list of (move bit index, games, average final disc difference) for every book move in the position
+        with player to move, best first. The list is empty when the position isn't in the book.
+        """
+        key_player, key_opponent, symmetry = bitboard.normalize_position(player, opponent)
+        moves = self._get_entries().get((key_player, key_opponent))
+        if not moves:
+            return []
+        to_original = bitboard.SYMMETRY_SQUARES[bitboard.SYMMETRY_INVERSES[symmetry]]
+        book_moves = [(to_original[move], games, total / games) for move, (games, total) in moves.items()
+                      if games >= self._min_games]
+        book_moves.sort(key=lambda book_move: (book_move[2], book_move[1]), reverse=True)
+        return book_moves
+
+    def lookup(self, player, opponent):
+        """returns the book move (bit index) for the position with player to move, or None if it isn't in the book"""
+        book_moves = self.get_book_moves(player, opponent)
+        if not book_moves:
+            return None
+        return book_moves[0][0]
+
+    def choose_move(self, game, piece_color):
+        """
+        returns the book move as a padded (row, column) position for piece_color in the Othello game, or None if the
+        position isn't in the book. Raises ValueError if the board isn't 8x8
+        """
+        board = game.get_board()
+        if board.get_geometry().get_width() != 8 or board.get_geometry().get_height() != 8:
+            raise ValueError("the opening book only plays on the standard 8x8 board")
+        black_bits, white_bits = board.get_bitboards()
+        if piece_color == "black":
+            move = self.lookup(black_bits, white_bits)
+        else:
+            move = self.lookup(white_bits, black_bits)
+        if move is None:
+            return None
+        return bitboard.bit_to_square(move)
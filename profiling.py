@@ -0,0 +1,96 @@
+# Author: Sonja Lavin
+# GitHub username: lavinso
+# Date: 10/18/26
+# Description: Optional profiling hook for the Othello classes. While a ClassProfiler is enabled every method of the
+# profiled classes is wrapped to count its calls and add up the time spent in it. Nothing is changed when it isn't
+# enabled, so the normal code paths pay no cost.
+
+import functools
+import time
+
+from Othello import Board, Othello
+
+
+class ClassProfiler:
+    """
+    Records per-method call counts and cumulative time for the given classes (Othello by default). Recursive calls
+    (return_available_positions and make_move call themselves) are counted, but only the outermost call is timed so
+    the time isn't counted twice. Use as a context manager or call enable and disable.
+    """
+    def __init__(self, classes=(Othello,)):
+        self._classes = classes
+        self._originals = []  # (class, method name, original function) to put back on disable
+        self._calls = {}
+        self._times = {}
+        self._depths = {}
+
+    def enable(self):
+        """wraps the methods of the profiled classes"""
+        if self._originals:
+            return
+        for profiled_class in self._classes:
+            for name, function in list(vars(profiled_class).items()):
+                if not callable(function) or isinstance(function, type):
+                    continue
+                if name.startswith("__") and name != "__init__":
+                    continue
+                label = profiled_class.__name__ + "." + name
+                self._calls.setdefault(label, 0)
+                self._times.setdefault(label, 0.0)
+                self._depths[label] = 0
+                self._originals.append((profiled_class, name, function))
+                setattr(profiled_class, name, self._wrap(label, function))
+
+    def disable(self):
+        """puts the original methods back"""
+        for profiled_class, name, function in self._originals:
+            setattr(profiled_class, name, function)
+        self._originals = []
+
+    def reset(self):
+        """clears the recorded counts and times"""
+        for label in self._calls:
+            self._calls[label] = 0
+            self._times[label] = 0.0
+
+    def get_report(self):
+        """
+        returns a dictionary of method name -> {"calls": number of calls, "total_time": seconds} for the methods that
+        were called, most time first
+        """
+        labels = sorted((label for label in self._calls if self._calls[label]), key=self._times.get, reverse=True)
+        return {label: {"calls": self._calls[label], "total_time": self._times[label]} for label in labels}
+
+    def _wrap(self, label, function):
+        """internal function that returns function wrapped to record its calls and time"""
+        calls = self._calls
+        times = self._times
+        depths = self._depths
+
+        @functools.wraps(function)
+        def profiled(*arguments, **keyword_arguments):
+            calls[label] += 1
+            if depths[label]:  # a recursive call, the outermost call is already being timed
+                return function(*arguments, **keyword_arguments)
+            depths[label] = 1
+            start = time.perf_counter()
+            try:
+                return function(*arguments, **keyword_arguments)
+            finally:
+                times[label] += time.perf_counter() - start
+                depths[label] = 0
+        return profiled
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.disable()
+
+
+def profile_othello(include_board=False):
+    """returns a ClassProfiler for Othello (and Board if include_board is True), ready to use with a with statement"""
+    if include_board:
+        return ClassProfiler((Othello, Board))
+    return ClassProfiler((Othello,))
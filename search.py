@@ -0,0 +1,433 @@
+# Author: Sonja Lavin
+# GitHub username: lavinso
+# Date: 10/18/26
+# Description: Computer opponent for Othello. SearchEngine picks a move with iterative deepening alpha-beta (negamax)
+# search over the bitboard move generator, using a Zobrist hashed transposition table and move ordering. It is
+# plugged into a game with Othello.create_player(name, color, engine=SearchEngine()).
+
+import random
+import time
+
+import bitboard
+
+CHECK_INTERVAL = 1024  # nodes between reads of the clock
+WIN_SCORE = 100000  # added to the disc difference of a finished game so it outranks any evaluation
+EXACT = 0  # transposition table score types
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+# static value of each square, used for move ordering and by the default evaluation. Corners are worth the most and
+# the squares next to an empty corner are the most dangerous.
+SQUARE_WEIGHTS = (
+    100, -20, 10, 5, 5, 10, -20, 100,
+    -20, -50, -2, -2, -2, -2, -50, -20,
+    10, -2, 1, 1, 1, 1, -2, 10,
+    5, -2, 1, 0, 0, 1, -2, 5,
+    5, -2, 1, 0, 0, 1, -2, 5,
+    10, -2, 1, 1, 1, 1, -2, 10,
+    -20, -50, -2, -2, -2, -2, -50, -20,
+    100, -20, 10, 5, 5, 10, -20, 100,
+)
+
+# Zobrist keys. The hash of a position is the xor of the key for every disc (by color and square) plus SIDE_KEY when
+# white is to move. FLIP_KEYS[square] changes a disc from one color to the other.
+_random = random.Random(20230522)
+ZOBRIST_KEYS = (
+    tuple(_random.getrandbits(64) for _ in range(64)),  # black discs
+    tuple(_random.getrandbits(64) for _ in range(64)),  # white discs
+)
+FLIP_KEYS = tuple(ZOBRIST_KEYS[0][square] ^ ZOBRIST_KEYS[1][square] for square in range(64))
+SIDE_KEY = _random.getrandbits(64)
+
+
+def zobrist_hash(black_bits, white_bits, color):
+    """returns the Zobrist hash of a position. color is the side to move, 0 for black and 1 for white"""
+    key = SIDE_KEY if color else 0
+    for square in bitboard.iterate_bits(black_bits):
+        key ^= ZOBRIST_KEYS[0][square]
+    for square in bitboard.iterate_bits(white_bits):
+        key ^= ZOBRIST_KEYS[1][square]
+    return key
+
+
+def evaluate_position(player, opponent):
+    """
+    default evaluation from the point of view of the side to move: square weights plus a bonus for having more legal
+    moves than the opponent
+    """
+    score = 0
+    for square in bitboard.iterate_bits(player):
+        score += SQUARE_WEIGHTS[square]
+    for square in bitboard.iterate_bits(opponent):
+        score -= SQUARE_WEIGHTS[square]
+    player_mobility = bitboard.legal_moves(player, opponent).bit_count()
+    opponent_mobility = bitboard.legal_moves(opponent, player).bit_count()
+    return score + 10 * (player_mobility - opponent_mobility)
+
+
+def final_score(player, opponent):
+    """returns the score of a finished game from the point of view of the side to move"""
+    return difference_score(player.bit_count() - opponent.bit_count())
+
+
+def difference_score(difference):
+    """returns the search score of a game that ends with the given disc difference for the side to move"""
+    if difference > 0:
+        return WIN_SCORE + difference
+    if difference < 0:
+        return -WIN_SCORE + difference
+    return 0
+
+
+class SearchTimeout(Exception):
+    """raised inside the search when the time or node budget for a move has been used up"""
+
+
+class TranspositionTable:
+    """
+    Fixed size table of search results indexed by the low bits of the Zobrist hash. Each slot holds one entry
+    (key, depth, score, score type, best move, generation). A new entry replaces the old one when the old one was
+    stored during an earlier search or was searched to the same or a smaller depth.
+    """
+    def __init__(self, size_bits=18):
+        """size_bits sets the number of slots to 2 ** size_bits"""
+        self._mask = (1 << size_bits) - 1
+        self._slots = [None] * (1 << size_bits)
+        self._generation = 0
+        self._probes = 0
+        self._hits = 0
+        self._stores = 0
+
+    def new_search(self):
+        """starts a new generation so entries from older searches are the first to be replaced"""
+        self._generation += 1
+
+    def clear(self):
+        """removes every entry"""
+        self._slots = [None] * len(self._slots)
+
+    def probe(self, key):
+        """returns the entry stored for key, or None"""
+        self._probes += 1
+        entry = self._slots[key & self._mask]
+        if entry is not None and entry[0] == key:
+            self._hits += 1
+            return entry
+        return None
+
+    def store(self, key, depth, score, score_type, best_move):
+        """stores a search result, following the replacement policy described in the class docstring"""
+        index = key & self._mask
+        entry = self._slots[index]
+        if entry is None or entry[5] != self._generation or depth >= entry[1]:
+            self._slots[index] = (key, depth, score, score_type, best_move, self._generation)
+            self._stores += 1
+
+    def get_size(self):
+        """returns the number of slots"""
+        return len(self._slots)
+
+    def get_statistics(self):
+        """returns a dictionary with the number of probes, hits, stores and the hit rate"""
+        if self._probes:
+            hit_rate = self._hits / self._probes
+        else:
+            hit_rate = 0.0
+        return {"probes": self._probes, "hits": self._hits, "stores": self._stores, "hit_rate": hit_rate}
+
+    def reset_statistics(self):
+        """sets the probe, hit and store counters back to 0"""
+        self._probes = 0
+        self._hits = 0
+        self._stores = 0
+
+
+class SearchEngine:
+    """
+    Computer player that picks moves with iterative deepening negamax alpha-beta search. Each move is limited by
+    time_limit (seconds) and/or node_limit, and the search stops early after max_depth. evaluator is a function
+    (player_bits, opponent_bits) -> score from the point of view of the side to move. An opening book
+    (opening_book.OpeningBook) is used while the position is in it, and an endgame solver (endgame.EndgameSolver)
+    plays perfectly once few enough squares are empty. The solver gets half of the time and node budget, and if it
+    doesn't finish the rest goes to the normal search.
+    """
+    def __init__(self, time_limit=1.0, node_limit=None, max_depth=60, table_bits=18, evaluator=evaluate_position,
+                 book=None, endgame_solver=None):
+        self._time_limit = time_limit
+        self._node_limit = node_limit
+        self._max_depth = max_depth
+        self._evaluator = evaluator
+        self._book = book
+        self._endgame_solver = endgame_solver
+        self._table = TranspositionTable(table_bits)
+        self._nodes = 0
+        self._next_check = 0
+        self._deadline = None
+        self._last_result = None
+
+    def get_table(self):
+        """returns the transposition table"""
+        return self._table
+
+    def get_last_result(self):
+        """returns the statistics dictionary of the last search, or None"""
+        return self._last_result
+
+    def choose_move(self, game, piece_color):
+        """
+        returns the padded (row, column) position the engine wants to play for piece_color in the Othello game, or
+        None if that color has no legal move
+        """
+        board = game.get_board()
+        if board.get_geometry().get_width() != 8 or board.get_geometry().get_height() != 8:
+            raise ValueError("the search engine only plays on the standard 8x8 board")
+        black_bits, white_bits = board.get_bitboards()
+        if piece_color == "black":
+            result = self.search(black_bits, white_bits, 0)
+        else:
+            result = self.search(white_bits, black_bits, 1)
+        if result["move"] is None:
+            return None
+        return bitboard.bit_to_square(result["move"])
+
+    def search(self, player, opponent, color):
+        """
+        searches the position with player to move (color 0 for black, 1 for white) and returns a dictionary with the
+        best move (bit index or None), its score, the last completed depth, the node count, elapsed time, nodes per
+        second, the transposition table hit rate for this search, where the move came from ("search", "book" or
+        "endgame") and the principal variation (the expected line of play, bit indexes with None for a pass)
+        """
+        start = self._start_budget()
+        self._table.new_search()
+        self._table.reset_statistics()
+
+        moves = bitboard.legal_moves(player, opponent)
+        best_move = None
+        best_score = 0
+        completed_depth = 0
+        source = "search"
+        book_move = None
+        if moves and self._book is not None:
+            book_move = self._book.lookup(player, opponent)
+        if book_move is not None:
+            best_move = book_move
+            source = "book"
+        elif moves and self._endgame_solver is not None and self._endgame_solver.can_solve(player, opponent):
+            solution = self._solve_endgame(player, opponent, start)
+            if solution is not None:
+                best_move = solution["move"]
+                best_score = difference_score(solution["score"])
+                completed_depth = 64 - (player | opponent).bit_count()
+                source = "endgame"
+        if moves and source == "search":
+            best_move = (moves & -moves).bit_length() - 1  # something to play even if depth 1 doesn't finish
+            if moves & (moves - 1) == 0:
+                completed_depth = 1  # only one move, no need to search
+            else:
+                root_key = zobrist_hash(*((player, opponent) if color == 0 else (opponent, player)), color)
+                empties = 64 - (player | opponent).bit_count()
+                for depth in range(1, min(self._max_depth, empties) + 1):
+                    try:
+                        best_score, best_move = self._search_root(player, opponent, color, root_key, depth, best_move)
+                    except SearchTimeout:
+                        break
+                    completed_depth = depth
+                    if abs(best_score) >= WIN_SCORE:  # the end of the game has been reached on every line
+                        break
+
+        elapsed = time.perf_counter() - start
+        table_statistics = self._table.get_statistics()
+        self._last_result = {
+            "move": best_move,
+            "score": best_score,
+            "depth": completed_depth,
+            "nodes": self._nodes,
+            "elapsed": elapsed,
+            "nodes_per_second": self._nodes / elapsed if elapsed > 0 else 0.0,
+            "table_hit_rate": table_statistics["hit_rate"],
+            "table_probes": table_statistics["probes"],
+            "table_hits": table_statistics["hits"],
+            "source": source,
+            "pv": [],
+        }
+        if source == "search" and completed_depth > 1:
+            self._last_result["pv"] = self.get_principal_variation(player, opponent, color, completed_depth)
+        elif best_move is not None:
+            self._last_result["pv"] = [best_move]
+        return self._last_result
+
+    def set_time_limit(self, time_limit):
+        """changes the time limit in seconds for later searches, None for no limit"""
+        self._time_limit = time_limit
+
+    def score_position(self, player, opponent, color, depth):
+        """
+        searches the position with player to move (color 0 for black, 1 for white) to exactly depth plies and returns
+        a dictionary with its score for player, the principal variation and the node count. Unlike search, positions
+        with one legal move are searched too. Raises SearchTimeout if the time or node budget runs out first.
+        """
+        self._start_budget()
+        self._table.new_search()
+        key = zobrist_hash(*((player, opponent) if color == 0 else (opponent, player)), color)
+        score = self._negamax(player, opponent, color, key, depth, -WIN_SCORE - 65, WIN_SCORE + 65)
+        return {"score": score, "pv": self.get_principal_variation(player, opponent, color, depth),
+                "nodes": self._nodes}
+
+    def get_principal_variation(self, player, opponent, color, max_length=60):
+        """
+        returns the best line found for the position with player to move, following the best moves stored in the
+        transposition table for up to max_length moves. Moves are bit indexes and a pass is None.
+        """
+        line = []
+        key = zobrist_hash(*((player, opponent) if color == 0 else (opponent, player)), color)
+        while len(line) < max_length:
+            moves = bitboard.legal_moves(player, opponent)
+            if not moves:
+                if not bitboard.legal_moves(opponent, player):
+                    break
+                line.append(None)  # player passes
+                player, opponent = opponent, player
+                color = 1 - color
+                key ^= SIDE_KEY
+                continue
+            entry = self._table.probe(key)
+            if entry is None or entry[4] is None or not moves >> entry[4] & 1:
+                break
+            move = entry[4]
+            flipped = bitboard.flipped_discs(player, opponent, move)
+            key ^= ZOBRIST_KEYS[color][move] ^ SIDE_KEY
+            for square in bitboard.iterate_bits(flipped):
+                key ^= FLIP_KEYS[square]
+            line.append(move)
+            player, opponent = opponent ^ flipped, player | flipped | (1 << move)
+            color = 1 - color
+        while line and line[-1] is None:
+            line.pop()
+        return line
+
+    def _start_budget(self):
+        """internal function that resets the node count and sets the deadline, returns the start time"""
+        start = time.perf_counter()
+        self._nodes = 0
+        self._next_check = CHECK_INTERVAL
+        if self._node_limit is not None:
+            self._next_check = min(CHECK_INTERVAL, self._node_limit)
+        if self._time_limit is None:
+            self._deadline = None
+        else:
+            self._deadline = start + self._time_limit
+        return start
+
+    def _solve_endgame(self, player, opponent, start):
+        """
+        internal function that runs the endgame solver with half of the time and node budget. Returns its result, or
+        None if it ran out; either way the solver's nodes count towards the budget of the search
+        """
+        deadline = None
+        if self._deadline is not None:
+            deadline = start + (self._deadline - start) / 2
+        node_limit = None
+        if self._node_limit is not None:
+            node_limit = self._node_limit // 2
+        try:
+            solution = self._endgame_solver.solve(player, opponent, deadline, node_limit)
+        except SearchTimeout:
+            self._nodes = self._endgame_solver.get_node_count()
+            return None
+        self._nodes = solution["nodes"]
+        return solution
+
+    def _search_root(self, player, opponent, color, key, depth, previous_best):
+        """internal function that searches every root move to depth and returns (score, best move)"""
+        alpha = -WIN_SCORE - 65
+        beta = WIN_SCORE + 65
+        best_move = previous_best
+        for move in self._order_moves(bitboard.legal_moves(player, opponent), previous_best):
+            flipped = bitboard.flipped_discs(player, opponent, move)
+            child_key = key ^ ZOBRIST_KEYS[color][move] ^ SIDE_KEY
+            for square in bitboard.iterate_bits(flipped):
+                child_key ^= FLIP_KEYS[square]
+            score = -self._negamax(opponent ^ flipped, player | flipped | (1 << move), 1 - color, child_key,
+                                   depth - 1, -beta, -alpha)
+            if score > alpha:
+                alpha = score
+                best_move = move
+        self._table.store(key, depth, alpha, EXACT, best_move)
+        return alpha, best_move
+
+    def _negamax(self, player, opponent, color, key, depth, alpha, beta):
+        """internal function, alpha-beta search of the position with player to move"""
+        self._nodes += 1
+        if self._nodes >= self._next_check:
+            self._check_budget()
+
+        moves = bitboard.legal_moves(player, opponent)
+        if not moves:
+            if not bitboard.legal_moves(opponent, player):
+                return final_score(player, opponent)
+            # player has to pass, the opponent moves from the same position
+            return -self._negamax(opponent, player, 1 - color, key ^ SIDE_KEY, depth, -beta, -alpha)
+        if depth <= 0:
+            return self._evaluator(player, opponent)
+
+        original_alpha = alpha
+        table_move = None
+        entry = self._table.probe(key)
+        if entry is not None:
+            table_move = entry[4]
+            if entry[1] >= depth:
+                if entry[3] == EXACT:
+                    return entry[2]
+                if entry[3] == LOWER_BOUND and entry[2] > alpha:
+                    alpha = entry[2]
+                elif entry[3] == UPPER_BOUND and entry[2] < beta:
+                    beta = entry[2]
+                if alpha >= beta:
+                    return entry[2]
+
+        best_score = -WIN_SCORE - 65
+        best_move = None
+        for move in self._order_moves(moves, table_move):
+            flipped = bitboard.flipped_discs(player, opponent, move)
+            child_key = key ^ ZOBRIST_KEYS[color][move] ^ SIDE_KEY
+            for square in bitboard.iterate_bits(flipped):
+                child_key ^= FLIP_KEYS[square]
+            score = -self._negamax(opponent ^ flipped, player | flipped | (1 << move), 1 - color, child_key,
+                                   depth - 1, -beta, -alpha)
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if best_score <= original_alpha:
+            score_type = UPPER_BOUND
+        elif best_score >= beta:
+            score_type = LOWER_BOUND
+        else:
+            score_type = EXACT
+        self._table.store(key, depth, best_score, score_type, best_move)
+        return best_score
+
+    def _order_moves(self, moves, first_move):
+        """internal function that returns the moves in the mask best first: the table move, then by square weight"""
+        ordered = sorted(bitboard.iterate_bits(moves), key=SQUARE_WEIGHTS.__getitem__, reverse=True)
+        if first_move is not None and first_move in ordered:
+            ordered.remove(first_move)
+            ordered.insert(0, first_move)
+        return ordered
+
+    def _check_budget(self):
+        """
+        internal function that raises SearchTimeout when the time or node budget is used up. The clock is read every
+        CHECK_INTERVAL nodes, and the next check never comes after the node limit
+        """
+        if self._node_limit is not None and self._nodes >= self._node_limit:
+            raise SearchTimeout()
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise SearchTimeout()
+        self._next_check = self._nodes + CHECK_INTERVAL
+        if self._node_limit is not None:
+            self._next_check = min(self._next_check, self._node_limit)
@@ -0,0 +1,202 @@
+# Author: Sonja Lavin
+# GitHub username: lavinso
+# Date: 10/18/26
+# Description: Batch self-play. Plays many complete Othello games across a pool of worker processes and streams each
+# finished game back as soon as its batch is done, so results can be aggregated or written out without holding every
+# game in memory. Run "python selfplay.py --help" for the command line options.
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from Othello import TOKENS, Othello
+from search import SearchEngine
+
+
+class RandomPolicy:
+    """
+    Move policy that picks a uniformly random legal move. Like SearchEngine it has a choose_move(game, piece_color)
+    method, so any object with that method can be used as a policy. start_game is called with a seed before every
+    game so a batch gives the same games no matter how they are split between workers.
+    """
+    def __init__(self, seed=None):
+        self._random = random.Random(seed)
+
+    def start_game(self, seed):
+        """reseeds the policy for a new game"""
+        self._random = random.Random(seed)
+
+    def choose_move(self, game, piece_color):
+        """returns a random legal (row, column) position for piece_color, or None if there is none"""
+        legal_moves = sorted(game.get_board().get_legal_moves(TOKENS[piece_color]))
+        if not legal_moves:
+            return None
+        return self._random.choice(legal_moves)
+
+
+def play_self_play_game(game_index, black_policy, white_policy, seed=0, board_size=8):
+    """
+    plays one game between the two policies on a board_size x board_size board and returns a dictionary with the
+    game index, final black and white counts, the winner ("black", "white" or "tie"), the list of (row, column) moves,
+    the worker's process id and the time the game took
+    """
+    start = time.perf_counter()
+    game_seed = seed * 1000003 + game_index
+    for policy, policy_seed in ((black_policy, 2 * game_seed), (white_policy, 2 * game_seed + 1)):
+        if hasattr(policy, "start_game"):
+            policy.start_game(policy_seed)
+
+    game = Othello(backend="bitboard", board_size=board_size)
+    game.create_player("black", "black", black_policy)
+    game.create_player("white", "white", white_policy)
+    board = game.get_board()
+    piece_color = "black"
+    while not game.is_game_over():
+        if board.has_legal_move(TOKENS[piece_color]):
+            policy = game.look_up_player_by_color(piece_color).get_engine()
+            game.apply_move(piece_color, policy.choose_move(game, piece_color))
+        # a player without a legal move passes
+        piece_color = "white" if piece_color == "black" else "black"
+
+    black_count = board.count_black_tokens()
+    white_count = board.count_white_tokens()
+    if black_count > white_count:
+        winner = "black"
+    elif white_count > black_count:
+        winner = "white"
+    else:
+        winner = "tie"
+    return {
+        "game": game_index,
+        "black": black_count,
+        "white": white_count,
+        "winner": winner,
+        "moves": [list(record.position) for record in game.get_move_history()],
+        "worker": os.getpid(),
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+def _play_batch(first_game, number_games, black_policy, white_policy, seed, board_size):
+    """internal function run by a worker process, plays a batch of consecutive games"""
+    return [play_self_play_game(game_index, black_policy, white_policy, seed, board_size)
+            for game_index in range(first_game, first_game + number_games)]
+
+
+def run_self_play(number_games, black_policy=None, white_policy=None, seed=0, workers=None, batch_size=16,
+                  board_size=8):
+    """
+    generator that plays number_games games on a pool of worker processes and yields each game's result dictionary
+    (see play_self_play_game) as its batch finishes. Results arrive in completion order, not game order. Policies
+    default to RandomPolicy and must be picklable. Only a few batches per worker are in flight at once, so memory use
+    doesn't grow with number_games.
+    """
+    if black_policy is None:
+        black_policy = RandomPolicy()
+    if white_policy is None:
+        white_policy = RandomPolicy()
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for first_game in range(0, number_games, batch_size):
+            batch = min(batch_size, number_games - first_game)
+            pending.add(executor.submit(_play_batch, first_game, batch, black_policy, white_policy, seed, board_size))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+
+class SelfPlayStatistics:
+    """
+    Running totals over self-play results: wins for each color, average final counts, overall games per second and
+    games per second for each worker process (games played divided by the time the worker spent playing them)
+    """
+    def __init__(self):
+        self._start = time.perf_counter()
+        self._games = 0
+        self._wins = {"black": 0, "white": 0, "tie": 0}
+        self._black_total = 0
+        self._white_total = 0
+        self._worker_games = {}
+        self._worker_time = {}
+
+    def add(self, result):
+        """adds one result dictionary from run_self_play"""
+        self._games += 1
+        self._wins[result["winner"]] += 1
+        self._black_total += result["black"]
+        self._white_total += result["white"]
+        worker = result["worker"]
+        self._worker_games[worker] = self._worker_games.get(worker, 0) + 1
+        self._worker_time[worker] = self._worker_time.get(worker, 0.0) + result["elapsed"]
+
+    def get_summary(self):
+        """returns the totals as a dictionary that can be written as JSON"""
+        elapsed = time.perf_counter() - self._start
+        games = max(self._games, 1)
+        worker_rates = {}
+        for worker, worker_games in self._worker_games.items():
+            worker_rates[str(worker)] = worker_games / self._worker_time[worker] if self._worker_time[worker] else 0.0
+        return {
+            "games": self._games,
+            "black_wins": self._wins["black"],
+            "white_wins": self._wins["white"],
+            "ties": self._wins["tie"],
+            "average_black": self._black_total / games,
+            "average_white": self._white_total / games,
+            "elapsed": elapsed,
+            "games_per_second": self._games / elapsed if elapsed > 0 else 0.0,
+            "games_per_second_per_worker": worker_rates,
+        }
+
+
+def _make_policy(name, time_limit):
+    """internal function that builds a policy from its command line name"""
+    if name == "search":
+        return SearchEngine(time_limit=time_limit, table_bits=14)
+    return RandomPolicy()
+
+
+def main(arguments=None):
+    """command line entry point. Writes one JSON line per game to --output and prints the summary as JSON"""
+    parser = argparse.ArgumentParser(description="Play a batch of Othello games on a process pool")
+    parser.add_argument("--games", type=int, default=1000, help="number of games to play")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the random policies")
+    parser.add_argument("--batch-size", type=int, default=16, help="games sent to a worker at a time")
+    parser.add_argument("--black", choices=("random", "search"), default="random", help="policy for black")
+    parser.add_argument("--white", choices=("random", "search"), default="random", help="policy for white")
+    parser.add_argument("--time-limit", type=float, default=0.05, help="seconds per move for the search policy")
+    parser.add_argument("--size", type=int, default=8, help="width and height of the playing area")
+    parser.add_argument("--output", help="file to write the game results to, one JSON object per line")
+    options = parser.parse_args(arguments)
+
+    statistics = SelfPlayStatistics()
+    output = open(options.output, "w") if options.output else None
+    try:
+        for result in run_self_play(options.games, _make_policy(options.black, options.time_limit),
+                                    _make_policy(options.white, options.time_limit), options.seed, options.workers,
+                                    options.batch_size, options.size):
+            statistics.add(result)
+            if output is not None:
+                output.write(json.dumps(result) + "\n")
+    finally:
+        if output is not None:
+            output.close()
+    json.dump(statistics.get_summary(), sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,541 @@
+# Author: Sonja Lavin
+# GitHub username: lavinso
+# Date: 10/18/26
+# Description: Asyncio game server. Hosts many Othello games at once in one process and talks line delimited JSON over
+# a TCP or Unix socket: every request is one JSON object on a line and gets one JSON object back with the same "id".
+# Results are returned as data instead of being printed, and computer moves are searched in an executor (worker
+# processes by default) so a slow search doesn't hold up the other games. Run "python server.py --help" for the
+# options; the commands are described in the README.
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import bitboard
+from Othello import TOKENS, Othello
+from search import SearchEngine
+
+OTHER_COLOR = {"black": "white", "white": "black"}
+MIN_BOARD_SIZE = 4
+MAX_BOARD_SIZE = 16  # game records only hold boards with up to 256 squares
+
+_worker_state = threading.local()  # one SearchEngine per worker process or thread, reused between moves
+
+
+def search_move(player, opponent, color, time_limit):
+    """
+    runs in the executor. Searches the 8x8 position with player to move (color 0 for black, 1 for white) and returns
+    the search result dictionary. Only masks go to the worker, so nothing large has to be pickled.
+    """
+    engine = getattr(_worker_state, "engine", None)
+    if engine is None:
+        engine = _worker_state.engine = SearchEngine(time_limit=time_limit)
+    engine.set_time_limit(time_limit)
+    return engine.search(player, opponent, color)
+
+
+class LatencyRecorder:
+    """
+    Keeps the latencies of the last max_samples requests of each command and reports percentiles. Latency is the time
+    from parsing a request to having its response, including waiting for the game's lock and for the executor.
+    """
+    def __init__(self, max_samples=10000):
+        self._max_samples = max_samples
+        self._samples = {}  # command -> deque of seconds
+        self._counts = {}
+
+    def add(self, command, seconds):
+        """records one request"""
+        samples = self._samples.get(command)
+        if samples is None:
+            samples = self._samples[command] = deque(maxlen=self._max_samples)
+        samples.append(seconds)
+        self._counts[command] = self._counts.get(command, 0) + 1
+
+    def get_percentiles(self):
+        """
+        returns a dictionary of command -> {"count", "p50", "p90", "p99", "max"}, the percentiles in milliseconds over
+        the recent samples, plus "all" for every command together
+        """
+        report = {}
+        everything = []
+        for command, samples in self._samples.items():
+            report[command] = self._summarize(sorted(samples), self._counts[command])
+            everything.extend(samples)
+        if everything:
+            report["all"] = self._summarize(sorted(everything), sum(self._counts.values()))
+        return report
+
+    def _summarize(self, ordered, count):
+        """internal function that returns the percentiles of a sorted list of seconds"""
+        def percentile(fraction):
+            return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+        return {"count": count, "p50": percentile(0.5), "p90": percentile(0.9), "p99": percentile(0.99),
+                "max": ordered[-1] * 1000}
+
+
+class GameSession:
+    """
+    One hosted game: the Othello object, whose turn it is and the time limit for computer moves. The lock makes the
+    requests for one game run one at a time while other games carry on.
+    """
+    def __init__(self, session_id, black_name="black", white_name="white", backend="bitboard", board_size=8,
+                 time_limit=1.0):
+        self._session_id = session_id
+        self._game = Othello(backend=backend, board_size=board_size)
+        self._game.create_player(black_name, "black")
+        self._game.create_player(white_name, "white")
+        self._to_move = "black"
+        self._time_limit = time_limit
+        self._lock = asyncio.Lock()
+        self._closed = False
+
+    def get_session_id(self):
+        """returns the session id"""
+        return self._session_id
+
+    def get_game(self):
+        """returns the Othello game"""
+        return self._game
+
+    def get_to_move(self):
+        """returns the color to move, or None when the game is over"""
+        return self._to_move
+
+    def get_time_limit(self):
+        """returns the seconds per computer move"""
+        return self._time_limit
+
+    def get_lock(self):
+        """returns the asyncio lock for this game"""
+        return self._lock
+
+    def close(self):
+        """marks the game as closed, later moves and undos raise ValueError"""
+        self._closed = True
+
+    def check_open(self):
+        """raises ValueError if the game has been closed"""
+        if self._closed:
+            raise ValueError("the game " + repr(self._session_id) + " is closed")
+
+    def get_state(self):
+        """returns the game as a dictionary that can be sent as JSON"""
+        board = self._game.get_board()
+        black_count = board.count_black_tokens()
+        white_count = board.count_white_tokens()
+        state = {
+            "session": self._session_id,
+            "board": ["".join(row[1:-1]) for row in board.get_game_board()[1:-1]],
+            "black": black_count,
+            "white": white_count,
+            "to_move": self._to_move,
+            "legal_moves": [],
+            "game_over": self._to_move is None,
+            "winner": None,
+        }
+        if self._to_move is not None:
+            state["legal_moves"] = [list(position) for position in sorted(board.get_legal_moves(TOKENS[self._to_move]))]
+        elif black_count > white_count:
+            state["winner"] = "black"
+        elif white_count > black_count:
+            state["winner"] = "white"
+        else:
+            state["winner"] = "tie"
+        return state
+
+    def play(self, piece_position):
+        """
+        plays piece_position for the color to move and returns (flipped positions, color that has to pass or None).
+        Raises ValueError if the move isn't legal.
+        """
+        self.check_open()
+        if self._to_move is None:
+            raise ValueError("the game is over")
+        board = self._game.get_board()
+        piece_position = (piece_position[0], piece_position[1])
+        if piece_position not in board.get_legal_moves(TOKENS[self._to_move]):
+            raise ValueError(str(list(piece_position)) + " is not a legal move for " + self._to_move)
+        record = self._game.apply_move(self._to_move, piece_position)
+        self._to_move = self._next_to_move(OTHER_COLOR[record.color])
+        passed = None
+        if self._to_move == record.color:
+            passed = OTHER_COLOR[record.color]
+        return record.flipped, passed
+
+    def undo(self):
+        """takes back the last move and returns its MoveRecord, or None if no moves have been made"""
+        self.check_open()
+        record = self._game.unmake_move()
+        if record is not None:
+            self._to_move = record.color
+        return record
+
+    def _next_to_move(self, piece_color):
+        """internal function that returns piece_color if it can move, else the other color if it can, else None"""
+        board = self._game.get_board()
+        if board.has_legal_move(TOKENS[piece_color]):
+            return piece_color
+        if board.has_legal_move(TOKENS[OTHER_COLOR[piece_color]]):
+            return OTHER_COLOR[piece_color]
+        return None
+
+
+class GameServer:
+    """
+    Hosts any number of GameSessions. Requests are JSON objects with a "command" and an optional "id" that is copied
+    to the response. A response is {"id": ..., "ok": true, "result": {...}} or {"id": ..., "ok": false, "error": "..."}.
+    Requests on one connection are handled concurrently, so responses can come back out of order; use the id to match
+    them. executor runs the searches for computer moves, a process pool with workers processes if it isn't given.
+    Time limits sent by clients are capped at max_time_limit seconds. Games belong to the connection that started
+    them and are closed when it closes.
+    """
+    def __init__(self, executor=None, workers=None, time_limit=1.0, max_sessions=100000, max_time_limit=60.0):
+        if executor is None:
+            executor = ProcessPoolExecutor(workers)
+        self._executor = executor
+        self._max_time_limit = max_time_limit
+        self._time_limit = self._check_time_limit(time_limit)
+        self._max_sessions = max_sessions
+        self._sessions = {}
+        self._session_ids = itertools.count(1)
+        self._latency = LatencyRecorder()
+        self._requests = 0
+        self._server = None
+        self._connections = {}  # handler task -> writer for every open connection
+        self._commands = {
+            "new": self._command_new,
+            "state": self._command_state,
+            "move": self._command_move,
+            "computer_move": self._command_computer_move,
+            "undo": self._command_undo,
+            "close": self._command_close,
+            "stats": self._command_stats,
+            "ping": self._command_ping,
+        }
+
+    def get_session_count(self):
+        """returns the number of open games"""
+        return len(self._sessions)
+
+    def get_latency(self):
+        """returns the LatencyRecorder"""
+        return self._latency
+
+    async def start(self, host="127.0.0.1", port=8765, unix_path=None):
+        """starts listening on host:port, or on the Unix socket unix_path if it is given"""
+        if unix_path is not None:
+            self._server = await asyncio.start_unix_server(self._handle_connection, unix_path, limit=1 << 20)
+        else:
+            self._server = await asyncio.start_server(self._handle_connection, host, port, limit=1 << 20)
+        return self._server
+
+    async def close(self):
+        """stops listening, closes the open connections once their requests are answered and shuts down the executor"""
+        if self._server is not None:
+            self._server.close()
+        for writer in list(self._connections.values()):
+            writer.transport.close()  # the handler sees the end of the stream and finishes its requests
+        if self._connections:
+            await asyncio.gather(*self._connections, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def handle_request(self, request, owned_sessions=None):
+        """
+        handles one request dictionary and returns the response dictionary. owned_sessions is the set of session ids
+        started by the request's connection, new adds to it and close removes from it
+        """
+        start = time.perf_counter()
+        request_id = None
+        command = "invalid"
+        try:
+            if not isinstance(request, dict):
+                raise ValueError("a request must be a JSON object")
+            request_id = request.get("id")
+            command = request.get("command")
+            handler = self._commands.get(command)
+            if handler is None:
+                command = "invalid"
+                raise ValueError("unknown command " + repr(request.get("command")))
+            response = {"id": request_id, "ok": True, "result": await handler(request)}
+            if owned_sessions is not None and command in ("new", "close"):
+                if command == "new":
+                    owned_sessions.add(response["result"]["session"])
+                else:
+                    owned_sessions.discard(response["result"]["session"])
+        except (ValueError, KeyError, TypeError, IndexError) as error:
+            if isinstance(error, KeyError):
+                message = "missing field " + str(error)
+            else:
+                message = str(error)
+            response = {"id": request_id, "ok": False, "error": message}
+        except Exception as error:  # anything unexpected still gets an answer instead of leaving the client waiting
+            response = {"id": request_id, "ok": False, "error": type(error).__name__ + ": " + str(error)}
+        self._requests += 1
+        self._latency.add(command, time.perf_counter() - start)
+        return response
+
+    async def _handle_connection(self, reader, writer):
+        """internal function that serves one client connection until it closes, then closes the games it started"""
+        tasks = set()
+        owned_sessions = set()
+        self._connections[asyncio.current_task()] = writer
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ConnectionError, ValueError):  # ValueError: a line longer than the limit
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.create_task(self._answer(line, writer, owned_sessions))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            del self._connections[asyncio.current_task()]
+            for session_id in owned_sessions:
+                session = self._sessions.get(session_id)
+                if session is not None:
+                    try:
+                        await self._close_session(session)
+                    except ValueError:  # closed by another connection in the meantime
+                        pass
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _answer(self, line, writer, owned_sessions):
+        """internal function that handles one request line and writes the response line"""
+        try:
+            request = json.loads(line)
+        except ValueError:
+            request = None
+            response = {"id": None, "ok": False, "error": "invalid JSON"}
+            self._latency.add("invalid", 0.0)
+        if request is not None:
+            response = await self.handle_request(request, owned_sessions)
+        if writer.is_closing():
+            return
+        writer.write(json.dumps(response).encode() + b"\n")
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    def _get_session(self, request):
+        """internal function that returns the session named in a request, raises ValueError if there isn't one"""
+        session = self._sessions.get(request["session"])
+        if session is None:
+            raise ValueError("no session " + repr(request["session"]))
+        return session
+
+    def _check_time_limit(self, time_limit):
+        """
+        internal function that returns time_limit as seconds capped at the server maximum, raises ValueError if it
+        isn't a finite positive number
+        """
+        time_limit = float(time_limit)
+        if not math.isfinite(time_limit) or time_limit <= 0:
+            raise ValueError("time_limit must be a finite positive number of seconds")
+        return min(time_limit, self._max_time_limit)
+
+    async def _command_new(self, request):
+        """starts a game. Optional fields: black, white (names), backend, size, time_limit"""
+        if len(self._sessions) >= self._max_sessions:
+            raise ValueError("too many sessions")
+        board_size = int(request.get("size", 8))
+        if not MIN_BOARD_SIZE <= board_size <= MAX_BOARD_SIZE:
+            raise ValueError("size must be from " + str(MIN_BOARD_SIZE) + " to " + str(MAX_BOARD_SIZE))
+        time_limit = self._check_time_limit(request.get("time_limit", self._time_limit))
+        session_id = next(self._session_ids)
+        session = GameSession(session_id, request.get("black", "black"), request.get("white", "white"),
+                              request.get("backend", "bitboard"), board_size, time_limit)
+        self._sessions[session_id] = session
+        return session.get_state()
+
+    async def _command_state(self, request):
+        """returns the state of a game"""
+        return self._get_session(request).get_state()
+
+    async def _command_move(self, request):
+        """plays "position": [row, column] for the color to move"""
+        session = self._get_session(request)
+        async with session.get_lock():
+            color = session.get_to_move()
+            flipped, passed = session.play(request["position"])
+            result = session.get_state()
+        result["move"] = {"color": color, "position": list(request["position"][:2]),
+                          "flipped": [list(position) for position in flipped], "passed": passed}
+        return result
+
+    async def _command_computer_move(self, request):
+        """
+        searches a move for the color to move in the executor and plays it. Optional field: time_limit. The result
+        includes the search statistics.
+        """
+        session = self._get_session(request)
+        async with session.get_lock():
+            session.check_open()
+            color = session.get_to_move()
+            if color is None:
+                raise ValueError("the game is over")
+            geometry = session.get_game().get_board().get_geometry()
+            if geometry.get_width() != 8 or geometry.get_height() != 8:
+                raise ValueError("computer moves are only available on the 8x8 board")
+            black_bits, white_bits = session.get_game().get_board().get_bitboards()
+            if color == "black":
+                arguments = (black_bits, white_bits, 0)
+            else:
+                arguments = (white_bits, black_bits, 1)
+            time_limit = self._check_time_limit(request.get("time_limit", session.get_time_limit()))
+            loop = asyncio.get_running_loop()
+            search = await loop.run_in_executor(self._executor, search_move, *arguments, time_limit)
+            piece_position = bitboard.bit_to_square(search["move"])
+            flipped, passed = session.play(piece_position)
+            result = session.get_state()
+        result["move"] = {"color": color, "position": list(piece_position),
+                          "flipped": [list(position) for position in flipped], "passed": passed}
+        result["search"] = search
+        return result
+
+    async def _command_undo(self, request):
+        """takes back the last move"""
+        session = self._get_session(request)
+        async with session.get_lock():
+            record = session.undo()
+            if record is None:
+                raise ValueError("no moves to take back")
+            result = session.get_state()
+        result["undone"] = {"color": record.color, "position": list(record.position),
+                            "flipped": [list(position) for position in record.flipped]}
+        return result
+
+    async def _command_close(self, request):
+        """ends a game once the requests already running on it are done and returns its final state"""
+        session = self._get_session(request)
+        await self._close_session(session)
+        return session.get_state()
+
+    async def _close_session(self, session):
+        """internal function that closes a game once the requests already running on it are done"""
+        async with session.get_lock():
+            session.check_open()
+            session.close()
+            self._sessions.pop(session.get_session_id(), None)
+
+    async def _command_stats(self, request):
+        """returns the number of open games, the number of requests and the latency percentiles in milliseconds"""
+        return {"sessions": len(self._sessions), "requests": self._requests,
+                "latency_ms": self._latency.get_percentiles()}
+
+    async def _command_ping(self, request):
+        """returns an empty result"""
+        return {}
+
+
+class GameClient:
+    """
+    Small client for GameServer. request sends one command and waits for its response, so several requests can be
+    in flight at once from different tasks.
+    """
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._request_ids = itertools.count(1)
+        self._pending = {}  # request id -> future for the response
+        self._read_task = asyncio.create_task(self._read_responses())
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=8765, unix_path=None):
+        """opens a connection to a server and returns a GameClient"""
+        if unix_path is not None:
+            reader, writer = await asyncio.open_unix_connection(unix_path, limit=1 << 20)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=1 << 20)
+        return cls(reader, writer)
+
+    async def request(self, command, **fields):
+        """sends a command and returns the response dictionary"""
+        request_id = next(self._request_ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        fields["command"] = command
+        fields["id"] = request_id
+        self._writer.write(json.dumps(fields).encode() + b"\n")
+        await self._writer.drain()
+        return await future
+
+    async def close(self):
+        """closes the connection"""
+        self._writer.close()
+        await self._writer.wait_closed()
+        await self._read_task
+
+    async def _read_responses(self):
+        """internal function that hands each response line to the request waiting for it"""
+        while True:
+            line = await self._reader.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            future = self._pending.pop(response.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result(response)
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("connection closed"))
+        self._pending.clear()
+
+
+async def serve(host="127.0.0.1", port=8765, unix_path=None, workers=None, executor_type="process", time_limit=1.0,
+                max_time_limit=60.0):
+    """runs a GameServer until it is cancelled"""
+    if executor_type == "thread":
+        executor = ThreadPoolExecutor(workers)
+    else:
+        executor = ProcessPoolExecutor(workers)
+    server = GameServer(executor, time_limit=time_limit, max_time_limit=max_time_limit)
+    listener = await server.start(host, port, unix_path)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(arguments=None):
+    """command line entry point"""
+    parser = argparse.ArgumentParser(description="Host Othello games over line delimited JSON")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on")
+    parser.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--workers", type=int, default=None, help="executor workers for computer moves")
+    parser.add_argument("--executor", choices=("process", "thread"), default="process",
+                        help="run searches in worker processes or threads")
+    parser.add_argument("--time-limit", type=float, default=1.0, help="default seconds per computer move")
+    parser.add_argument("--max-time-limit", type=float, default=60.0,
+                        help="longest time limit a client can ask for, in seconds")
+    options = parser.parse_args(arguments)
+    try:
+        asyncio.run(serve(options.host, options.port, options.unix, options.workers, options.executor,
+                          options.time_limit, options.max_time_limit))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
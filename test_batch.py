@@ -0,0 +1,104 @@
+# Author: Sonja Lavin
+# GitHub username: lavinso
+# Date: 10/18/26
+# Description: Checks batch.py against the single position move generators. Random positions are played with the
+# original list backend, then the batched legal moves and boards after every move are compared with bitboard.py and
+# with Othello.apply_move on both backends (taking each move back with unmake_move and replaying it). Run with
+# "python -m unittest test_batch" or pytest; it is skipped when numpy isn't installed.
+
+import random
+import unittest
+
+import batch
+import bitboard
+from Othello import TOKENS, Othello
+
+
+def random_positions(number_positions, seed):
+    """returns a list of (list backend Othello game, color to move) for random positions that have a legal move"""
+    generator = random.Random(seed)
+    positions = []
+    while len(positions) < number_positions:
+        game = Othello(backend="list")
+        game.create_player("black", "black")
+        game.create_player("white", "white")
+        piece_color = "black"
+        for _ in range(generator.randrange(0, 60)):
+            if game.is_game_over():
+                break
+            legal_moves = game.get_board().get_legal_moves(TOKENS[piece_color])
+            if legal_moves:
+                game.make_move(piece_color, generator.choice(sorted(legal_moves)))
+            piece_color = "white" if piece_color == "black" else "black"
+        if game.get_board().has_legal_move(TOKENS[piece_color]):
+            positions.append((game, piece_color))
+    return positions
+
+
+def masks_for(game, piece_color):
+    """returns the (player, opponent) masks of a game with piece_color to move"""
+    black_bits, white_bits = game.get_board().get_bitboards()
+    if piece_color == "black":
+        return black_bits, white_bits
+    return white_bits, black_bits
+
+
+@unittest.skipIf(batch.numpy is None, "numpy isn't installed")
+class BatchTest(unittest.TestCase):
+    """compares the batched results with bitboard.py and Othello.apply_move"""
+
+    def setUp(self):
+        self.positions = random_positions(150, seed=6)
+        masks = [masks_for(game, piece_color) for game, piece_color in self.positions]
+        self.player = batch.numpy.array([player for player, _ in masks], dtype=batch.numpy.uint64)
+        self.opponent = batch.numpy.array([opponent for _, opponent in masks], dtype=batch.numpy.uint64)
+
+    def test_legal_moves(self):
+        legal = batch.legal_moves(self.player, self.opponent)
+        for index, (game, piece_color) in enumerate(self.positions):
+            player, opponent = masks_for(game, piece_color)
+            self.assertEqual(int(legal[index]), bitboard.legal_moves(player, opponent))
+            self.assertEqual(set(bitboard.mask_to_squares(int(legal[index]))),
+                             set(game.return_available_positions(piece_color)))
+
+    def test_expand_positions_matches_apply_move(self):
+        result = batch.expand_positions(self.player, self.opponent)
+        for backend in ("list", "bitboard"):
+            generated = 0
+            for index, (list_game, piece_color) in enumerate(self.positions):
+                if backend == "list":
+                    game = list_game.clone()
+                else:
+                    game = Othello(backend="bitboard")
+                    game.create_player("black", "black")
+                    game.create_player("white", "white")
+                    game.restore(list_game.snapshot())
+                before = [row[:] for row in game.get_board().get_game_board()]
+                moves = sorted(game.get_board().get_legal_moves(TOKENS[piece_color]),
+                               key=lambda square: bitboard.square_to_bit(*square))
+                for piece_position in moves:
+                    self.assertEqual(int(result["position"][generated]), index)
+                    self.assertEqual(bitboard.bit_to_square(int(result["move"][generated])), piece_position)
+                    record = game.apply_move(piece_color, piece_position)
+                    player, opponent = masks_for(game, piece_color)
+                    self.assertEqual(int(result["player"][generated]), player)
+                    self.assertEqual(int(result["opponent"][generated]), opponent)
+                    self.assertEqual(set(bitboard.mask_to_squares(int(result["flipped"][generated]))),
+                                     set(record.flipped))
+                    game.unmake_move()
+                    self.assertEqual(game.get_board().get_game_board(), before)
+                    game.redo_move()
+                    self.assertEqual(masks_for(game, piece_color), (player, opponent))
+                    game.unmake_move()
+                    generated += 1
+        self.assertEqual(generated, len(result["move"]))
+
+    def test_board_arrays_round_trip(self):
+        boards = batch.bitboards_to_boards(self.player, self.opponent)
+        player, opponent = batch.boards_to_bitboards(boards)
+        self.assertTrue((player == self.player).all())
+        self.assertTrue((opponent == self.opponent).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
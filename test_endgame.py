@@ -0,0 +1,127 @@
+# Author: Sonja Lavin
+# GitHub username: lavinso
+# Date: 10/18/26
+# Description: Checks the endgame solver and the opening book. The solver's exact result is compared with a plain
+# minimax over the whole game tree on random positions with few empty squares, and the book is checked through a
+# save/load round trip and lookups in every symmetric version of its positions. Run with
+# "python -m unittest test_endgame" or pytest.
+
+import os
+import random
+import tempfile
+import unittest
+
+import bitboard
+from endgame import EndgameSolver
+from opening_book import OpeningBook
+from Othello import Othello
+
+
+def random_game(seed, number_moves=60):
+    """returns the moves (bit indexes) and the (player, opponent) masks before each of them for a random game"""
+    generator = random.Random(seed)
+    player, opponent = bitboard.BLACK_START, bitboard.WHITE_START
+    moves = []
+    positions = []
+    while len(moves) < number_moves:
+        legal = bitboard.legal_moves(player, opponent)
+        if not legal:
+            if not bitboard.legal_moves(opponent, player):
+                break
+            player, opponent = opponent, player
+            continue
+        move = generator.choice(list(bitboard.iterate_bits(legal)))
+        positions.append((player, opponent))
+        moves.append(move)
+        player, opponent, _ = bitboard.play_move(player, opponent, move)
+        player, opponent = opponent, player
+    return moves, positions, (player, opponent)
+
+
+def minimax(player, opponent):
+    """returns the final disc difference for player with perfect play, searching every line"""
+    legal = bitboard.legal_moves(player, opponent)
+    if not legal:
+        if not bitboard.legal_moves(opponent, player):
+            return player.bit_count() - opponent.bit_count()
+        return -minimax(opponent, player)
+    best = -65
+    for move in bitboard.iterate_bits(legal):
+        new_player, new_opponent, _ = bitboard.play_move(player, opponent, move)
+        best = max(best, -minimax(new_opponent, new_player))
+    return best
+
+
+class EndgameSolverTest(unittest.TestCase):
+    """compares the solver with minimax"""
+
+    def test_solve_is_exact(self):
+        solver = EndgameSolver()
+        for seed in range(40):
+            _, _, (player, opponent) = random_game(seed, number_moves=53)  # 7 empty squares left
+            expected = minimax(player, opponent)
+            result = solver.solve(player, opponent)
+            self.assertEqual(result["score"], expected)
+            if result["move"] is not None:
+                new_player, new_opponent, _ = bitboard.play_move(player, opponent, result["move"])
+                self.assertEqual(-minimax(new_opponent, new_player), expected)
+
+    def test_choose_move_checks_the_position(self):
+        solver = EndgameSolver()
+        game = Othello(backend="bitboard", board_size=10)
+        game.create_player("black", "black")
+        game.create_player("white", "white")
+        self.assertRaises(ValueError, solver.choose_move, game, "black")
+        game = Othello(backend="bitboard")
+        game.create_player("black", "black")
+        game.create_player("white", "white")
+        self.assertRaises(ValueError, solver.choose_move, game, "black")  # far too many empty squares
+
+
+class OpeningBookTest(unittest.TestCase):
+    """checks the book file round trip and the symmetric lookups"""
+
+    def setUp(self):
+        self.book = OpeningBook(max_plies=8)
+        self.games = [random_game(seed)[:2] for seed in range(20)]
+        for moves, _ in self.games:
+            self.book.add_game(moves)
+
+    def test_save_and_load(self):
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            self.book.save(path)
+            loaded = OpeningBook(path, max_plies=8)
+            self.assertEqual(len(loaded), len(self.book))
+            for _, positions in self.games:
+                for player, opponent in positions[:8]:
+                    self.assertEqual(loaded.get_book_moves(player, opponent),
+                                     self.book.get_book_moves(player, opponent))
+        finally:
+            os.remove(path)
+
+    def test_symmetric_lookup(self):
+        # a position can be its own mirror image (the start position is), then any of the equivalent moves may come
+        # back, so the positions after the moves are compared instead of the squares
+        for _, positions in self.games:
+            for player, opponent in positions[:8]:
+                move = self.book.lookup(player, opponent)
+                self.assertIsNotNone(move)
+                self.assertTrue(bitboard.legal_moves(player, opponent) >> move & 1)
+                expected = bitboard.normalize_position(*bitboard.play_move(player, opponent, move)[:2])[:2]
+                for symmetry in bitboard.SYMMETRIES:
+                    symmetric_player, symmetric_opponent = symmetry(player), symmetry(opponent)
+                    symmetric_move = self.book.lookup(symmetric_player, symmetric_opponent)
+                    after = bitboard.play_move(symmetric_player, symmetric_opponent, symmetric_move)[:2]
+                    self.assertEqual(bitboard.normalize_position(*after)[:2], expected)
+
+    def test_choose_move_only_on_8x8(self):
+        game = Othello(backend="bitboard", board_size=10)
+        game.create_player("black", "black")
+        game.create_player("white", "white")
+        self.assertRaises(ValueError, self.book.choose_move, game, "black")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+# Author: Sonja Lavin
+# GitHub username: lavinso
+# Date: 10/18/26
+# Description: Checks that game_record.py round trips positions and games without losing anything, and that an
+# archive with a partly written last record can be appended to. Run with "python -m unittest test_game_record" or
+# pytest.
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from game_record import (GameRecordReader, GameRecordWriter, decode_moves, decode_position, encode_moves,
+                         encode_position)
+from Othello import TOKENS, Othello
+
+
+def random_game(seed, board_size=8, backend="bitboard"):
+    """returns an Othello game played to the end with random moves"""
+    generator = random.Random(seed)
+    game = Othello(backend=backend, board_size=board_size)
+    game.create_player("black", "black")
+    game.create_player("white", "white")
+    board = game.get_board()
+    piece_color = "black"
+    while not game.is_game_over():
+        legal_moves = board.get_legal_moves(TOKENS[piece_color])
+        if legal_moves:
+            game.apply_move(piece_color, generator.choice(sorted(legal_moves)))
+        piece_color = "white" if piece_color == "black" else "black"
+    return game
+
+
+class GameRecordTest(unittest.TestCase):
+    """round trips through the encodings and the archive files"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_position_round_trip(self):
+        for seed in range(10):
+            for backend in ("list", "bitboard"):
+                game = random_game(seed, backend=backend)
+                for _ in range(seed * 5):
+                    game.unmake_move()
+                board = decode_position(encode_position(game.get_board()), backend)
+                self.assertEqual(board.get_game_board(), game.get_board().get_game_board())
+                self.assertEqual(board.get_bitboards(), game.get_board().get_bitboards())
+
+    def test_moves_round_trip(self):
+        for seed in range(10):
+            game = random_game(seed)
+            decoded = decode_moves(encode_moves(game))
+            self.assertEqual(decoded.get_board().get_game_board(), game.get_board().get_game_board())
+            self.assertEqual(decoded.get_move_history(), game.get_move_history())
+
+    def test_bad_move_byte(self):
+        self.assertRaises(ValueError, decode_moves, bytes([200]))
+        self.assertRaises(ValueError, decode_moves, bytes([0]))
+
+    def test_archive_round_trip(self):
+        for board_size in (8, 10):
+            path = os.path.join(self.directory, "games" + str(board_size) + ".bin")
+            games = [random_game(seed, board_size) for seed in range(5)]
+            with GameRecordWriter(path, board_size) as writer:
+                for game in games[:3]:
+                    writer.write_game(game)
+            with GameRecordWriter(path, board_size) as writer:  # appending to an existing file
+                for game in games[3:]:
+                    writer.write_game(game)
+            with GameRecordReader(path) as reader:
+                self.assertEqual(reader.get_board_size(), board_size)
+                self.assertEqual(len(reader), len(games))
+                for index, game in enumerate(games):
+                    self.assertEqual(reader[index], encode_moves(game))
+                    self.assertEqual(reader.get_game(index).get_board().get_game_board(),
+                                     game.get_board().get_game_board())
+            other_size = 10 if board_size == 8 else 8
+            self.assertRaises(ValueError, GameRecordWriter, path, other_size)  # the header holds another size
+
+    def test_append_after_partial_record(self):
+        path = os.path.join(self.directory, "games.bin")
+        games = [random_game(seed) for seed in range(4)]
+        with GameRecordWriter(path) as writer:
+            for game in games[:3]:
+                writer.write_game(game)
+        with open(path, "r+b") as archive:  # a writer stopped in the middle of the last record
+            archive.truncate(os.path.getsize(path) - 10)
+        with GameRecordReader(path) as reader:
+            self.assertEqual(len(reader), 2)
+        with GameRecordWriter(path) as writer:
+            writer.write_game(games[3])
+        with GameRecordReader(path) as reader:
+            self.assertEqual(len(reader), 3)
+            for index, game in enumerate((games[0], games[1], games[3])):
+                self.assertEqual(reader.get_game(index).get_board().get_game_board(),
+                                 game.get_board().get_game_board())
+
+
+if __name__ == "__main__":
+    unittest.main()